@@ -0,0 +1,68 @@
+"""
+Мікро-бенчмарк JWT-бекендів (src/services/tokens.py): encode і verify для HS256/HS512.
+
+    poetry run python -m benchmarks.jwt_backends -n 20000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.services.tokens import BACKENDS, get_codec
+
+
+SECRET = "benchmark-secret-key-0123456789abcdef"
+ALGORITHMS = ["HS256", "HS512"]
+
+
+def _payload() -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "sub": "user@example.com",
+        "uid": 42,
+        "role": "user",
+        "ver": 0,
+        "iat": now,
+        "exp": now + timedelta(minutes=15),
+    }
+
+
+def _ops_per_sec(fn, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return n / (time.perf_counter() - start)
+
+
+def run(n: int) -> list[dict]:
+    results = []
+    for name in BACKENDS:
+        codec = get_codec(name)
+        for alg in ALGORITHMS:
+            payload = _payload()
+            token = codec.encode(payload, SECRET, alg)
+            codec.decode(token, SECRET, [alg])  # прогрів
+
+            encode = _ops_per_sec(lambda: codec.encode(payload, SECRET, alg), n)
+            verify = _ops_per_sec(lambda: codec.decode(token, SECRET, [alg]), n)
+            results.append(
+                {"backend": name, "alg": alg, "encode": encode, "verify": verify}
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JWT backend benchmark")
+    parser.add_argument("-n", type=int, default=10000, help="operations per case")
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'alg':<6} {'encode ops/s':>14} {'verify ops/s':>14}")
+    for r in run(args.n):
+        print(
+            f"{r['backend']:<8} {r['alg']:<6} "
+            f"{r['encode']:>14,.0f} {r['verify']:>14,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
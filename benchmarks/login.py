@@ -0,0 +1,121 @@
+"""
+Бенчмарк /api/auth/login для різних вартостей bcrypt (BCRYPT_ROUNDS).
+
+Запити йдуть через in-process ASGI-клієнт (httpx.ASGITransport) у справжній
+маршрут login; БД і Redis підмінені в пам'яті, тож вимірюється саме bcrypt,
+пул PasswordHasher і накладні витрати FastAPI.
+
+    poetry run python -m benchmarks.login --costs 10 11 12 -n 200 -c 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+
+from main import app
+from src.database.db import get_db
+from src.database.models import User
+from src.repository import users as repository_users
+from src.services.hashing import _hash, password_hasher
+from src.services.sessions import session_store
+
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark-password"
+
+
+async def _no_db():
+    yield None
+
+
+def _install_fakes(user: User) -> None:
+    async def get_user_by_email(email, db):
+        return user if email == user.email else None
+
+    async def create_session(email):
+        return uuid.uuid4().hex
+
+    app.dependency_overrides[get_db] = _no_db
+    repository_users.get_user_by_email = get_user_by_email
+    session_store.create = create_session
+
+
+async def _run_cost(cost: int, total: int, concurrency: int) -> dict:
+    password_hasher.rounds = cost
+    user = User(
+        id=1,
+        username="bench",
+        email=EMAIL,
+        password=_hash(PASSWORD, cost),
+        role="user",
+        confirmed=True,
+        created_at=datetime.now(),
+    )
+    _install_fakes(user)
+
+    latencies: list[float] = []
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    async with client:
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                r = await client.post(
+                    "/api/auth/login", data={"username": EMAIL, "password": PASSWORD}
+                )
+                latencies.append(time.perf_counter() - start)
+                if r.status_code != 200:
+                    raise RuntimeError(f"login failed: {r.status_code} {r.text}")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    cores = min(password_hasher.workers, os.cpu_count() or 1)
+    q = statistics.quantiles(latencies, n=100)
+    return {
+        "cost": cost,
+        "p50_ms": q[49] * 1000,
+        "p99_ms": q[98] * 1000,
+        "rps": total / elapsed,
+        "rps_per_core": total / elapsed / cores,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Login throughput per bcrypt cost")
+    parser.add_argument("--costs", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("-n", type=int, default=200, help="logins per cost")
+    parser.add_argument("-c", type=int, default=16, help="concurrent clients")
+    args = parser.parse_args()
+
+    print(
+        f"workers={password_hasher.workers} "
+        f"executor={password_hasher.stats()['executor']} concurrency={args.c}"
+    )
+    print(f"{'cost':>4} {'p50 ms':>9} {'p99 ms':>9} {'logins/s':>9} {'per core':>9}")
+    try:
+        for cost in args.costs:
+            r = await _run_cost(cost, args.n, args.c)
+            print(
+                f"{r['cost']:>4} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+                f"{r['rps']:>9.1f} {r['rps_per_core']:>9.1f}"
+            )
+    finally:
+        password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""
+Мікро-бенчмарк серіалізації списку контактів (GET /api/contacts):
+шлях response_model (ORM -> Pydantic from_attributes -> json) проти швидкого
+шляху FAST_JSON (кортежі рядків -> orjson; для порівняння - і stdlib json)
+на 10, 100 і 10 000 рядках.
+Вимірюється тільки серіалізація, без БД (ORM-об'єкти і рядки створені заздалегідь).
+
+    poetry run python -m benchmarks.serialization
+"""
+
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from typing import List
+
+from pydantic import TypeAdapter
+
+from src.database.models import Contact
+from src.schemas import ContactResponse
+from src.services.serialization import CONTACT_RESPONSE_FIELDS, contact_rows_json
+
+
+SIZES = [10, 100, 10000]
+adapter = TypeAdapter(List[ContactResponse])
+
+
+def _contacts(n: int) -> list[Contact]:
+    return [
+        Contact(
+            id=i + 1,
+            first_name=f"Name{i}",
+            last_name=f"Last{i % 97}",
+            email=f"contact{i}@example.com",
+            phone="+380501234567",
+            birthday=date(1980, 1, 1) + timedelta(days=i * 13 % 9000),
+            extra="Колега" if i % 3 else None,
+            user_id=1,
+        )
+        for i in range(n)
+    ]
+
+
+# Те, що робить FastAPI для response_model=List[ContactResponse]:
+# валідація (from_attributes) -> dump_python(mode="json") -> JSONResponse (json.dumps)
+def response_model_path(contacts: list[Contact]) -> bytes:
+    value = adapter.validate_python(contacts, from_attributes=True)
+    return json.dumps(
+        adapter.dump_python(value, mode="json"),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+# Кеш відповідей (response_cache.dump_json): валідація + dump_json у pydantic-core
+def pydantic_dump_json(contacts: list[Contact]) -> bytes:
+    return adapter.dump_json(adapter.validate_python(contacts, from_attributes=True))
+
+
+# Той самий швидкий шлях, але стандартним json (внесок orjson окремо)
+def rows_stdlib_json(rows: list[tuple]) -> bytes:
+    return json.dumps(
+        [dict(zip(CONTACT_RESPONSE_FIELDS, row)) for row in rows],
+        default=date.isoformat,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode()
+
+
+def _ms_per_call(fn, arg, n: int) -> float:
+    fn(arg)  # прогрів
+    start = time.perf_counter()
+    for _ in range(n):
+        fn(arg)
+    return (time.perf_counter() - start) / n * 1000
+
+
+def run(budget: int) -> list[dict]:
+    cases = [
+        ("response_model", response_model_path, "orm"),
+        ("pydantic dump_json", pydantic_dump_json, "orm"),
+        ("rows + json", rows_stdlib_json, "rows"),
+        ("rows + orjson", contact_rows_json, "rows"),
+    ]
+
+    results = []
+    for size in SIZES:
+        contacts = _contacts(size)
+        rows = [
+            tuple(getattr(c, name) for name in CONTACT_RESPONSE_FIELDS)
+            for c in contacts
+        ]
+        # усі шляхи мають давати однакові байти
+        expected = response_model_path(contacts)
+        assert contact_rows_json(rows) == rows_stdlib_json(rows) == expected
+
+        n = max(5, budget // size)
+        baseline = None
+        for name, fn, source in cases:
+            ms = _ms_per_call(fn, contacts if source == "orm" else rows, n)
+            baseline = baseline or ms
+            results.append(
+                {"rows": size, "path": name, "ms": ms, "speedup": baseline / ms}
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Contact list serialization benchmark")
+    parser.add_argument(
+        "--budget", type=int, default=200000, help="rows serialized per case"
+    )
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'path':<20} {'ms/response':>12} {'speedup':>8}")
+    for r in run(args.budget):
+        print(
+            f"{r['rows']:>6} {r['path']:<20} {r['ms']:>12.3f} {r['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import asyncio
+import logging
+import signal
+import sys
+from contextlib import suppress
+from datetime import datetime
+
+from src.database.db import engine
+from src.services.cache import redis_client
+from src.services.digest import run_digest, next_run
+from src.services.email import mailer, preload_templates, debug_spool
+
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("birthday_digest")
+
+
+# Планувальник щоденного дайджесту днів народження.
+# Без аргументів - працює постійно і запускає дайджест раз на добу
+# (при старті теж, якщо сьогоднішній ще не зроблено).
+#   --once   один запуск (для cron / k8s CronJob)
+#   --force  перерахувати, навіть якщо сьогодні вже запускався
+async def main(once: bool, force: bool):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    preload_templates()
+    debug_spool.start()
+    try:
+        while not stop.is_set():
+            try:
+                await run_digest(force=force)
+            except Exception as err:
+                logger.exception(f"Birthday digest failed: {err!r}")
+            force = False
+            if once:
+                break
+            run_at = next_run(datetime.now())
+            logger.info(f"Next birthday digest at {run_at}")
+            delay = (run_at - datetime.now()).total_seconds()
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(stop.wait(), delay)
+    finally:
+        await mailer.close()
+        await debug_spool.stop()
+        await redis_client.aclose()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(once="--once" in sys.argv, force="--force" in sys.argv))
+
+
+# poetry run python birthday_digest.py [--once] [--force]
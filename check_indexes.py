@@ -0,0 +1,167 @@
+import asyncio
+import json
+import os
+import sys
+import uuid
+from datetime import date, timedelta
+
+from sqlalchemy import event, insert, delete, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.database.models import Contact, User
+from src.repository import contacts as repo_contacts
+
+
+# Перевірка, що кожен запит читання з repository/contacts.py використовує індекс.
+# Засіває тимчасові дані (~40 тис. контактів), виконує кожну функцію репозиторію,
+# перехоплює її SQL і запускає EXPLAIN. Помилка, якщо в плані є Seq Scan по contacts.
+# Лише окрема база з TEST_DATABASE_URL - базу застосунку (DATABASE_URL) не чіпає.
+#
+#   DATABASE_URL=$TEST_DATABASE_URL poetry run alembic upgrade head
+#   TEST_DATABASE_URL=postgresql+asyncpg://... poetry run python check_indexes.py
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    sys.exit("TEST_DATABASE_URL is not set (separate database for seeded data)")
+
+engine = create_async_engine(TEST_DATABASE_URL)
+session = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+USERS = 200
+CONTACTS_PER_USER = 200
+
+RUN = uuid.uuid4().hex[:8]
+
+
+def _queries(user: User, first_page: list[Contact]):
+    last = first_page[-1]
+    return {
+        "get_contacts(offset)": lambda db: repo_contacts.get_contacts(
+            0, 10, user, db
+        ),
+        "get_contacts(cursor, id)": lambda db: repo_contacts.get_contacts(
+            0, 10, user, db, after=repo_contacts.sort_values(last, "id")
+        ),
+        "get_contacts(cursor, name)": lambda db: repo_contacts.get_contacts(
+            0, 10, user, db, sort="name", after=repo_contacts.sort_values(last, "name")
+        ),
+        "get_contact": lambda db: repo_contacts.get_contact(last.id, user, db),
+        "search_contacts": lambda db: repo_contacts.search_contacts(
+            "Name1", user, db
+        ),
+        "search_contacts(trgm)": lambda db: repo_contacts.search_contacts(
+            "Name1", user, db, ranked=True
+        ),
+        "get_upcoming_birthdays": lambda db: repo_contacts.get_upcoming_birthdays(
+            7, user, db
+        ),
+        "get_upcoming_birthdays(30)": lambda db: repo_contacts.get_upcoming_birthdays(
+            30, user, db
+        ),
+    }
+
+
+async def seed() -> list[User]:
+    async with session() as db:
+        users = [
+            User(
+                username=f"idx{i}",
+                email=f"idx-check-{RUN}-{i}@example.com",
+                password="-",
+            )
+            for i in range(USERS)
+        ]
+        db.add_all(users)
+        await db.flush()
+        rows = [
+            {
+                "first_name": f"Name{n}",
+                "last_name": f"Last{n % 97}",
+                "email": f"idx-check-{RUN}-{u.id}-{n}@example.com",
+                "phone": "+380000000000",
+                "birthday": date(1990, 1, 1) + timedelta(days=n * 7),
+                "user_id": u.id,
+            }
+            for u in users
+            for n in range(CONTACTS_PER_USER)
+        ]
+        await db.execute(insert(Contact), rows)
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE contacts"))
+        await conn.commit()
+    return users
+
+
+async def cleanup(users: list[User]) -> None:
+    async with session() as db:
+        await db.execute(delete(User).where(User.id.in_([u.id for u in users])))
+        await db.commit()
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    found = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") == "contacts":
+        found.append("Seq Scan on contacts")
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def _index_names(plan: dict) -> list[str]:
+    names = [plan["Index Name"]] if "Index Name" in plan else []
+    for child in plan.get("Plans", []):
+        names.extend(_index_names(child))
+    return names
+
+
+async def check(users: list[User]) -> bool:
+    user = users[len(users) // 2]
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    async with session() as db:
+        first_page = await repo_contacts.get_contacts(0, 10, user, db)
+        queries = _queries(user, first_page)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            statements = {}
+            for name, call in queries.items():
+                captured.clear()
+                await call(db)
+                statements[name] = captured[-1]
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    ok = True
+    async with engine.connect() as conn:
+        for name, (statement, parameters) in statements.items():
+            res = await conn.exec_driver_sql(
+                f"EXPLAIN (FORMAT JSON) {statement}", parameters
+            )
+            raw = res.scalar_one()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+            problems = _seq_scans(plan)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status:>4}] {name:<28} indexes={_index_names(plan)}")
+            ok = ok and not problems
+    return ok
+
+
+async def main() -> int:
+    engine.echo = False
+    users = await seed()
+    try:
+        ok = await check(users)
+    finally:
+        await cleanup(users)
+    print(">>>>> All repository queries use indexes" if ok else "ERROR: Seq Scan found")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
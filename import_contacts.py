@@ -0,0 +1,41 @@
+import argparse
+import asyncio
+import json
+import sys
+
+from src.database.db import session, engine
+from src.repository.users import get_user_by_email
+from src.services.importer import FORMATS, detect_format, import_contacts
+
+
+# Імпорт контактів користувача з CSV/JSONL-файлу (той самий шлях, що й
+# POST /api/contacts/import: читання частинами, COPY, злиття з конфліктами)
+async def run(email: str, path: str, fmt: str | None) -> int:
+    fmt = detect_format(fmt, path)
+    if fmt is None:
+        print("Cannot detect file format, use --format csv|jsonl")
+        return 2
+
+    async with session() as db:
+        user = await get_user_by_email(email, db)
+        if user is None:
+            print(f"User {email} not found")
+            return 1
+        with open(path, "rb") as file:
+            report = await import_contacts(file, fmt, user.id, db)
+    await engine.dispose()
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import contacts for a user")
+    parser.add_argument("email", help="owner of the imported contacts")
+    parser.add_argument("path", help="CSV (with header) or JSONL file")
+    parser.add_argument("--format", choices=FORMATS)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.email, args.path, args.format)))
+
+
+# poetry run python import_contacts.py user@example.com contacts.csv
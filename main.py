@@ -1,16 +1,21 @@
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from fastapi_limiter import FastAPILimiter
 from fastapi.templating import Jinja2Templates
 import redis.asyncio as redis
+import asyncio
 import logging
 import os, sys
 from datetime import datetime
 
 from src.conf.config import settings
-from src.routes import contacts, health, auth, users, debug
+from src.routes import contacts, health, auth, users, debug, avatars
 from src.core.error_handlers import init_exception_handlers
 from src.middleware import setup_middlewares
+from src.services.cache import listen_invalidations
+from src.services.hashing import password_hasher
+from src.services.email import mailer, preload_templates, debug_spool
+from src.services.response_cache import response_cache
 
 
 print(
@@ -40,9 +45,22 @@ async def lifespan_handler(app: FastAPI):
     )
     await FastAPILimiter.init(app.state.redis)  # Ініціалізація лімітерів
 
+    preload_templates()
+    debug_spool.start()
+
+    # підписка на інвалідацію локального кешу користувачів
+    invalidation_task = asyncio.create_task(listen_invalidations())
+
     try:
         yield  # працює FastAPI
     finally:
+        invalidation_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await invalidation_task
+        password_hasher.shutdown()
+        await mailer.close()
+        await debug_spool.stop()
+        await response_cache.close()
         await app.state.redis.close()
 
 
@@ -61,6 +79,7 @@ setup_middlewares(app)  # подключаем middlewares
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(contacts.router, prefix="/api")
+app.include_router(avatars.router, prefix="/api")
 app.include_router(health.router, prefix="/system")
 app.include_router(debug.router, prefix="/api")
 
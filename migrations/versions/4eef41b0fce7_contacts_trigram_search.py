@@ -0,0 +1,51 @@
+"""contacts trigram search indexes
+
+Revision ID: 4eef41b0fce7
+Revises: c1db192fe0c5
+Create Date: 2026-10-18 11:03:17.550412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4eef41b0fce7'
+down_revision: Union[str, Sequence[str], None] = 'c1db192fe0c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_COLUMNS = ['first_name', 'last_name', 'email']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # GIN-індекси з gin_trgm_ops працюють і для ILIKE '%q%', і для оператора %
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            op.create_index(
+                f'ix_contacts_{column}_trgm',
+                'contacts',
+                [column],
+                unique=False,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for column in TRGM_COLUMNS:
+            op.drop_index(
+                f'ix_contacts_{column}_trgm',
+                table_name='contacts',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    # розширення pg_trgm не видаляємо - ним можуть користуватися інші об'єкти
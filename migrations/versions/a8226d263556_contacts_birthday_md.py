@@ -0,0 +1,58 @@
+"""contacts birthday month-day key
+
+Revision ID: a8226d263556
+Revises: 4eef41b0fce7
+Create Date: 2026-10-18 12:21:44.309156
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8226d263556'
+down_revision: Union[str, Sequence[str], None] = '4eef41b0fce7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # STORED-колонка заповнюється для всіх рядків одразу (перезапис таблиці
+    # під ACCESS EXCLUSIVE) - на великій таблиці запускати у вікно обслуговування
+    op.add_column(
+        'contacts',
+        sa.Column(
+            'birthday_md',
+            sa.SmallInteger(),
+            sa.Computed(
+                'CAST(EXTRACT(MONTH FROM birthday) * 100'
+                ' + EXTRACT(DAY FROM birthday) AS SMALLINT)',
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_contacts_user_id_birthday_md',
+            'contacts',
+            ['user_id', 'birthday_md'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contacts_user_id_birthday_md',
+            table_name='contacts',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_column('contacts', 'birthday_md')
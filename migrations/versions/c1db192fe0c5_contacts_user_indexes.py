@@ -0,0 +1,60 @@
+"""contacts per-user indexes
+
+Revision ID: c1db192fe0c5
+Revises: 0002f7dc2e2a
+Create Date: 2026-10-18 10:12:41.204917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1db192fe0c5'
+down_revision: Union[str, Sequence[str], None] = '0002f7dc2e2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY не працює всередині транзакції - autocommit,
+    # таблиця contacts лишається доступною для запису під час побудови
+    with op.get_context().autocommit_block():
+        # список / keyset-пагінація за id, get_contact, update, delete
+        op.create_index(
+            'ix_contacts_user_id_id',
+            'contacts',
+            ['user_id', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # список з sort=name
+        op.create_index(
+            'ix_contacts_user_id_last_name_first_name',
+            'contacts',
+            ['user_id', 'last_name', 'first_name', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_contacts_user_id_last_name_first_name',
+            table_name='contacts',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'ix_contacts_user_id_id',
+            table_name='contacts',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -23,7 +23,7 @@ async def create_admin():
             print(f"User {ADMIN_EMAIL} already exists (role={user.role})")
             return
 
-        pwd_hash = auth_service.get_password_hash(ADMIN_PASSWORD)
+        pwd_hash = await auth_service.get_password_hash(ADMIN_PASSWORD)
         admin = User(
             username="admin", email=ADMIN_EMAIL, password=pwd_hash, role="admin"
         )
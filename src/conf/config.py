@@ -1,5 +1,5 @@
 from typing import Any, Optional
-from pydantic import ConfigDict, field_validator, EmailStr
+from pydantic import ConfigDict, field_validator, EmailStr, ValidationInfo
 from pydantic_settings import BaseSettings
 
 
@@ -18,8 +18,19 @@ class Settings(BaseSettings):
     # --- JWT ---
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    JWT_BACKEND: str = "jose"  # jose | pyjwt
     ACCESS_EXPIRE_MIN: int = 15
     REFRESH_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_MAXSIZE: int = 4096  # кеш перевірених access-токенів
+    # Stateless-режим: uid/role/ver в access-токені, без читання User з БД
+    STATELESS_AUTH: bool = False
+    TOKEN_VERSION_CACHE_TTL: int = 5  # секунд
+
+    # --- Password hashing (bcrypt у пулі) ---
+    BCRYPT_ROUNDS: int = 12  # вартість bcrypt; старі хеші перехешуються при логіні
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # thread | process
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64
 
     # --- Admin (seed.py) ---
     ADMIN_EMAIL: EmailStr
@@ -31,19 +42,65 @@ class Settings(BaseSettings):
     MAIL_FROM: EmailStr
     MAIL_PORT: int = 2525
     MAIL_SERVER: str
+    MAIL_POOL_SIZE: int = 2  # кількість постійних SMTP-з'єднань
+    MAIL_MAX_PER_SESSION: int = 100  # листів на одне з'єднання до перепідключення
+    MAIL_TIMEOUT: float = 30  # секунд на одну SMTP-операцію
+
+    # --- Email queue (worker.py) ---
+    EMAIL_QUEUE_MAX_ATTEMPTS: int = 5
+    EMAIL_QUEUE_BACKOFF_BASE: float = 2  # секунд, затримка = base ** attempts
+    EMAIL_QUEUE_BACKOFF_MAX: float = 300
+    EMAIL_WORKER_CONCURRENCY: int = 4
+    # секунд на задачу до повернення в чергу (має перекривати найгірший send)
+    EMAIL_QUEUE_VISIBILITY_TIMEOUT: float = 300
 
     # Чи логувати листи у файл (tmp_emails/) при успішному надсиланні
     DEBUG_EMAILS: bool = True
+    DEBUG_EMAILS_MAX_FILES: int = 500  # ротація tmp_emails/
 
     # --- Cloudinary ---
     CLOUDINARY_NAME: str
     CLOUDINARY_API_KEY: str
     CLOUDINARY_API_SECRET: str
 
+    # --- Contacts search (pg_trgm: similarity-ранжування і нечіткий збіг) ---
+    CONTACT_SEARCH_TRGM: bool = False
+    # Розмір пакета /api/contacts/bulk (8 параметрів на рядок, ліміт PostgreSQL - 32767)
+    BULK_MAX_ITEMS: int = 1000
+    # Імпорт CSV/JSONL (POST /api/contacts/import, import_contacts.py)
+    IMPORT_CHUNK_ROWS: int = 5000  # рядків на одну частину (валідація + COPY)
+    IMPORT_MAX_REPORTED_ERRORS: int = 100  # скільки помилок рядків повертати у звіті
+    IMPORT_MAX_BYTES: int = 50 * 1024 * 1024  # розмір файлу POST /import
+    EXPORT_CHUNK_ROWS: int = 1000  # рядків на fetch серверного курсора (GET /export)
+
+    # --- Birthday digest (birthday_digest.py, раз на добу) ---
+    BIRTHDAY_DIGEST_DAYS: int = 7  # вікно дайджесту; менші days віддаються з нього
+    BIRTHDAY_DIGEST_HOUR: int = 6  # година запуску (локальний час сервера)
+    BIRTHDAY_DIGEST_EMAILS: bool = True  # надсилати листи-нагадування
+    BIRTHDAY_DIGEST_BATCH: int = 100  # користувачів на пачку (Redis + одна SMTP-сесія)
+    APP_URL: str = "http://localhost:8000/"  # посилання в листах дайджесту
+
+    # --- Avatars ---
+    AVATAR_STORAGE: str = "cloudinary"  # cloudinary | local
+    AVATAR_LOCAL_DIR: str = "src/static/avatars"
+    AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
+
     # --- Redis ---
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
 
+    # --- Response cache (готові JSON-відповіді /api/contacts у Redis), 0 - вимкнено ---
+    RESPONSE_CACHE_TTL_LIST: int = 60  # секунд
+    RESPONSE_CACHE_TTL_CONTACT: int = 60
+    RESPONSE_CACHE_TTL_SEARCH: int = 30
+    RESPONSE_CACHE_TTL_BIRTHDAYS: int = 300
+    # Швидка серіалізація GET /api/contacts: рядки БД -> JSON (orjson)
+    FAST_JSON: bool = False
+
+    # --- User cache (in-process рівень перед Redis) ---
+    USER_CACHE_LOCAL_MAXSIZE: int = 1024
+    USER_CACHE_LOCAL_TTL: int = 30  # секунд
+
     # --- PGAdmin ---
     PGADMIN_DEFAULT_EMAIL: str
     PGADMIN_DEFAULT_PASSWORD: str
@@ -63,6 +120,79 @@ class Settings(BaseSettings):
             raise ValueError("ALGORITHM must be HS256 or HS512")
         return v
 
+    @field_validator("JWT_BACKEND")
+    @classmethod
+    def validate_jwt_backend(cls, v: Any):
+        if v not in ["jose", "pyjwt"]:
+            raise ValueError("JWT_BACKEND must be jose or pyjwt")
+        return v
+
+    @field_validator("AVATAR_STORAGE")
+    @classmethod
+    def validate_avatar_storage(cls, v: Any):
+        if v not in ["cloudinary", "local"]:
+            raise ValueError("AVATAR_STORAGE must be cloudinary or local")
+        return v
+
+    @field_validator("BIRTHDAY_DIGEST_HOUR")
+    @classmethod
+    def validate_digest_hour(cls, v: Any):
+        if not 0 <= v <= 23:
+            raise ValueError("BIRTHDAY_DIGEST_HOUR must be between 0 and 23")
+        return v
+
+    @field_validator("BIRTHDAY_DIGEST_DAYS")
+    @classmethod
+    def validate_digest_days(cls, v: Any):
+        if not 0 <= v <= 366:
+            raise ValueError("BIRTHDAY_DIGEST_DAYS must be between 0 and 366")
+        return v
+
+    @field_validator("BULK_MAX_ITEMS")
+    @classmethod
+    def validate_bulk_max_items(cls, v: Any):
+        if not 1 <= v <= 4000:
+            raise ValueError("BULK_MAX_ITEMS must be between 1 and 4000")
+        return v
+
+    @field_validator(
+        "IMPORT_CHUNK_ROWS",
+        "IMPORT_MAX_REPORTED_ERRORS",
+        "IMPORT_MAX_BYTES",
+        "EXPORT_CHUNK_ROWS",
+    )
+    @classmethod
+    def validate_chunk_limits(cls, v: Any):
+        if v < 1:
+            raise ValueError("must be >= 1")
+        return v
+
+    # Найгірший send: з'єднання + лист, і те саме ще раз після перепідключення
+    @field_validator("EMAIL_QUEUE_VISIBILITY_TIMEOUT")
+    @classmethod
+    def validate_visibility_timeout(cls, v: Any, info: ValidationInfo):
+        worst_send = 4 * info.data.get("MAIL_TIMEOUT", 30)
+        if v <= worst_send:
+            raise ValueError(
+                f"EMAIL_QUEUE_VISIBILITY_TIMEOUT must be greater than {worst_send:g} "
+                "(4 * MAIL_TIMEOUT)"
+            )
+        return v
+
+    @field_validator("BCRYPT_ROUNDS")
+    @classmethod
+    def validate_bcrypt_rounds(cls, v: Any):
+        if not 4 <= v <= 31:
+            raise ValueError("BCRYPT_ROUNDS must be between 4 and 31")
+        return v
+
+    @field_validator("PASSWORD_HASH_EXECUTOR")
+    @classmethod
+    def validate_hash_executor(cls, v: Any):
+        if v not in ["thread", "process"]:
+            raise ValueError("PASSWORD_HASH_EXECUTOR must be thread or process")
+        return v
+
     # --- Properties для строк ---
     @property
     # Асинк URL для FastAPI (asyncpg)
@@ -2,7 +2,23 @@ from __future__ import annotations
 from datetime import datetime, date
 from typing import Optional, List
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, Date, ForeignKey, func, Boolean
+from sqlalchemy import (
+    String,
+    Integer,
+    SmallInteger,
+    DateTime,
+    Date,
+    ForeignKey,
+    func,
+    Boolean,
+    Index,
+    Computed,
+)
+
+
+BIRTHDAY_MD_SQL = (
+    "CAST(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday) AS SMALLINT)"
+)
 
 
 class Base(DeclarativeBase):
@@ -21,6 +37,9 @@ class User(Base):
         DateTime, server_default=func.now(), nullable=False
     )
     avatar: Mapped[Optional[str]] = mapped_column(String(255))
+    # Не використовується: refresh-сесії зберігає SessionStore (Redis).
+    # Колонку видалити окремою міграцією в наступному релізі, коли жоден
+    # запущений екземпляр попередньої версії її вже не пише.
     refresh_token: Mapped[Optional[str]] = mapped_column(String(255))
     role: Mapped[str] = mapped_column(String(20), nullable=False, server_default="user")
 
@@ -32,6 +51,30 @@ class User(Base):
 
 class Contact(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        # всі запити repository/contacts.py фільтрують за user_id
+        Index("ix_contacts_user_id_id", "user_id", "id"),
+        Index(
+            "ix_contacts_user_id_last_name_first_name",
+            "user_id",
+            "last_name",
+            "first_name",
+            "id",
+        ),
+        # найближчі дні народження: діапазони birthday_md в межах користувача
+        Index("ix_contacts_user_id_birthday_md", "user_id", "birthday_md"),
+        # пошук (pg_trgm): ILIKE '%q%' і similarity-ранжування
+        *(
+            Index(
+                f"ix_contacts_{column}_trgm",
+                column,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+            for column in ("first_name", "last_name", "email")
+        ),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     first_name: Mapped[str] = mapped_column(String(25), nullable=False)
     last_name: Mapped[str] = mapped_column(String(25), nullable=False)
@@ -40,6 +83,10 @@ class Contact(Base):
     )
     phone: Mapped[str] = mapped_column(String(20), nullable=False)
     birthday: Mapped[date] = mapped_column(Date, nullable=False)
+    # місяць*100 + день (1231 = 31 грудня), рахується самою БД при запису
+    birthday_md: Mapped[int] = mapped_column(
+        SmallInteger, Computed(BIRTHDAY_MD_SQL, persisted=True)
+    )
     extra: Mapped[Optional[str]] = mapped_column(String(250))
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id", ondelete="CASCADE"), nullable=False
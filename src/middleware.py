@@ -24,4 +24,5 @@ def setup_middlewares(app):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag"],  # доступні фронтенду
     )
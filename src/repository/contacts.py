@@ -1,24 +1,88 @@
+from calendar import isleap
 from datetime import date, timedelta
 from typing import List
-from sqlalchemy import select, or_, and_, func
+from sqlalchemy import (
+    select,
+    insert,
+    update,
+    delete,
+    values,
+    column,
+    or_,
+    and_,
+    func,
+    tuple_,
+    literal,
+    Float,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 
 from src.database.models import Contact, User
-from src.schemas import ContactCreate, ContactUpdate
+from src.schemas import (
+    ContactCreate,
+    ContactUpdate,
+    ContactBulkUpdateItem,
+    ContactResponse,
+)
+from src.services.cache import contacts_changed
+from src.services.importer import MAX_LENGTHS
 
 
 # Функції для роботи з контактами в БД
 
 
-# Отримати всі контакти
+# Ключі сортування списку: стабільний порядок, id - завжди останній (унікальність)
+SORT_KEYS = {
+    "id": (Contact.id,),
+    "name": (Contact.last_name, Contact.first_name, Contact.id),
+}
+
+# Типи значень курсора для кожного режиму (пошук з pg_trgm: [score, id])
+CURSOR_TYPES = {
+    **{
+        sort: tuple(column.type.python_type for column in columns)
+        for sort, columns in SORT_KEYS.items()
+    },
+    "search": (int,),
+    "search:trgm": (float, int),
+}
+
+
+# Колонки у порядку полів ContactResponse (швидка серіалізація рядків, FAST_JSON)
+RESPONSE_COLUMNS = tuple(
+    getattr(Contact, name) for name in ContactResponse.model_fields
+)
+
+
+def sort_values(contact: Contact, sort: str) -> list:
+    return [getattr(contact, col.key) for col in SORT_KEYS[sort]]
+
+
+# Отримати всі контакти.
+# after - значення ключа сортування останнього рядка попередньої сторінки
+# (keyset-пагінація: WHERE (key) > (after) замість OFFSET); інакше - OFFSET skip.
+# as_rows=True - рядки з RESPONSE_COLUMNS замість ORM-об'єктів.
 async def get_contacts(
-    skip: int, limit: int, user: User, db: AsyncSession
+    skip: int,
+    limit: int,
+    user: User,
+    db: AsyncSession,
+    sort: str = "id",
+    after: list | None = None,
+    as_rows: bool = False,
 ) -> List[Contact]:
-    result = await db.execute(
-        select(Contact).where(Contact.user_id == user.id).offset(skip).limit(limit)
-    )
-    return list(result.scalars().all())
+    columns = SORT_KEYS[sort]
+    stmt = select(*RESPONSE_COLUMNS) if as_rows else select(Contact)
+    stmt = stmt.where(Contact.user_id == user.id)
+    if after is not None:
+        stmt = stmt.where(tuple_(*columns) > tuple_(*after))
+    else:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.order_by(*columns).limit(limit))
+    return list(result.all() if as_rows else result.scalars().all())
 
 
 # Отримати контакт по id
@@ -31,98 +95,356 @@ async def get_contact(contact_id: int, user: User, db: AsyncSession) -> Contact
     return result.scalar_one_or_none()
 
 
-# Створити новий контакт
+# Створити новий контакт: INSERT ... RETURNING (згенеровані колонки без refresh)
 async def create_contact(body: ContactCreate, user: User, db: AsyncSession) -> Contact:
-    contact = Contact(**body.model_dump(), user_id=user.id)
-    db.add(contact)
+    stmt = (
+        insert(Contact)
+        .values(**body.model_dump(), user_id=user.id)
+        .returning(Contact)
+    )
     try:
+        contact = await db.scalar(select(Contact).from_statement(stmt))
         await db.commit()
-        await db.refresh(contact)
-        return contact
     except Exception:
         await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Email already exists"
         )
+    await contacts_changed(user.id)
+    return contact
 
 
-# Оновити контакт
+# Оновити контакт: один UPDATE ... WHERE id AND user_id RETURNING
 async def update_contact(
     contact_id: int, body: ContactUpdate, user: User, db: AsyncSession
 ) -> Contact | None:
-    result = await db.execute(
-        select(Contact).where(
-            and_(Contact.id == contact_id, Contact.user_id == user.id)
-        )
+    data = body.model_dump(exclude_unset=True)
+    if not data:
+        return await get_contact(contact_id, user, db)
+    stmt = (
+        update(Contact)
+        .where(Contact.id == contact_id, Contact.user_id == user.id)
+        .values(**data)
+        .returning(Contact)
     )
-    contact = result.scalar_one_or_none()
+    contact = await db.scalar(select(Contact).from_statement(stmt))
+    await db.commit()
     if contact:
-        for field, value in body.model_dump(exclude_unset=True).items():
-            setattr(contact, field, value)
-        await db.commit()
-        await db.refresh(contact)
+        await contacts_changed(user.id)
     return contact
 
 
-# Видалити контакт
-async def delete_contact(contact_id: int, user: User, db: AsyncSession) -> bool:
-    result = await db.execute(
-        select(Contact).where(
-            and_(Contact.id == contact_id, Contact.user_id == user.id)
-        )
+# Видалити контакт: один DELETE ... WHERE id AND user_id RETURNING
+async def delete_contact(
+    contact_id: int, user: User, db: AsyncSession
+) -> Contact | None:
+    stmt = (
+        delete(Contact)
+        .where(Contact.id == contact_id, Contact.user_id == user.id)
+        .returning(Contact)
     )
-    contact = result.scalar_one_or_none()
+    contact = await db.scalar(select(Contact).from_statement(stmt))
+    await db.commit()
     if contact:
-        await db.delete(contact)
-        await db.commit()
+        await contacts_changed(user.id)
     return contact
 
 
-# Пошук по імені, прізвищу та email
-async def search_contacts(q: str, user: User, db: AsyncSession):
-    like = f"%{q}%"
-    res = await db.execute(
-        select(Contact).where(
-            and_(
-                Contact.user_id == user.id,
+# Колонки, які задає користувач (без id, user_id і згенерованих)
+CONTACT_FIELDS = ("first_name", "last_name", "email", "phone", "birthday", "extra")
+NOT_FOUND = "Contact not found"
+EMAIL_TAKEN = "Email already exists"
+
+
+def _result(
+    index: int,
+    status: str,
+    contact: Contact | None = None,
+    contact_id: int | None = None,
+    detail: str | None = None,
+) -> dict:
+    return {
+        "index": index,
+        "status": status,
+        "id": contact.id if contact is not None else contact_id,
+        "detail": detail,
+        "contact": contact,
+    }
+
+
+# Довжина рядкових полів понад VARCHAR(n) - помилка елемента, а не DataError (500)
+def _too_long(item: ContactCreate) -> str | None:
+    for name, length in MAX_LENGTHS.items():
+        value = getattr(item, name)
+        if value is not None and len(value) > length:
+            return f"{name}: longer than {length} characters"
+    return None
+
+
+# Виконати пакетний запит і закомітити; email, зайнятий паралельним записом
+# між перевіркою і запитом, - 409 для всього пакета (транзакцію відкочено)
+async def _commit_bulk(stmt, db: AsyncSession) -> list[Contact]:
+    try:
+        contacts = list(await db.scalars(select(Contact).from_statement(stmt)))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=EMAIL_TAKEN)
+    except Exception:
+        await db.rollback()
+        raise
+    return contacts
+
+
+# Пакетне створення: один INSERT ... VALUES (...), (...) ON CONFLICT DO NOTHING
+# RETURNING в одній транзакції. Зайнятий email (в БД або раніше в цьому ж
+# пакеті) - результат "conflict" для елемента, решта пакета створюється.
+async def bulk_create_contacts(
+    items: List[ContactCreate], user: User, db: AsyncSession
+) -> list[dict]:
+    results: list[dict | None] = [None] * len(items)
+    first_index: dict[str, int] = {}
+    rows = []
+    for index, item in enumerate(items):
+        if error := _too_long(item):
+            results[index] = _result(index, "invalid", detail=error)
+        elif item.email in first_index:
+            results[index] = _result(
+                index, "conflict", detail="Duplicate email in request"
+            )
+        else:
+            first_index[item.email] = index
+            rows.append({**item.model_dump(), "user_id": user.id})
+
+    created = []
+    if rows:
+        stmt = (
+            pg_insert(Contact)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[Contact.email])
+            .returning(Contact)
+        )
+        created = await _commit_bulk(stmt, db)
+        await contacts_changed(user.id)
+
+    for contact in created:
+        index = first_index.pop(contact.email)
+        results[index] = _result(index, "created", contact)
+    for index in first_index.values():
+        results[index] = _result(index, "conflict", detail=EMAIL_TAKEN)
+    return results  # type: ignore[return-value]
+
+
+# Пакетне оновлення: один UPDATE contacts ... FROM (VALUES ...) RETURNING,
+# лише контакти користувача. Чужі/відсутні id і email, зайнятий іншим
+# контактом, перевіряються заздалегідь - такий елемент отримує "not_found"
+# або "conflict" і не зриває весь пакет.
+async def bulk_update_contacts(
+    items: List[ContactBulkUpdateItem], user: User, db: AsyncSession
+) -> list[dict]:
+    results: list[dict | None] = [None] * len(items)
+    owners: dict[str, int] = {}  # email -> id контакту, якому він належить
+    mine: set[int] = set()  # id контактів користувача з цього пакета
+    if items:
+        ids = {item.id for item in items}
+        res = await db.execute(
+            select(Contact.id, Contact.email, Contact.user_id).where(
                 or_(
-                    Contact.first_name.ilike(like),
-                    Contact.last_name.ilike(like),
-                    Contact.email.ilike(like),
-                ),
+                    Contact.email.in_({item.email for item in items}),
+                    Contact.id.in_(ids),
+                )
             )
         )
-    )
-    return list(res.scalars().all())
+        for contact_id, email, user_id in res.all():
+            owners[email] = contact_id
+            if user_id == user.id and contact_id in ids:
+                mine.add(contact_id)
 
+    pending: dict[int, int] = {}  # id контакту -> index
+    seen_emails: set[str] = set()
+    for index, item in enumerate(items):
+        if error := _too_long(item):
+            results[index] = _result(
+                index, "invalid", contact_id=item.id, detail=error
+            )
+        elif item.id not in mine:
+            # email не резервується: елемент нічого не оновить
+            results[index] = _result(
+                index, "not_found", contact_id=item.id, detail=NOT_FOUND
+            )
+        elif item.id in pending:
+            results[index] = _result(
+                index, "conflict", contact_id=item.id, detail="Duplicate id in request"
+            )
+        elif item.email in seen_emails or owners.get(item.email, item.id) != item.id:
+            results[index] = _result(
+                index, "conflict", contact_id=item.id, detail=EMAIL_TAKEN
+            )
+        else:
+            pending[item.id] = index
+            seen_emails.add(item.email)
 
-# Список контактів з ДР в найбижчі N днів
-async def get_upcoming_birthdays(days: int, user: User, db: AsyncSession):
-    today = date.today()
-    end_date = today + timedelta(days=days)
-
-    today_md = today.strftime("%m-%d")
-    end_md = end_date.strftime("%m-%d")
-
-    if today_md <= end_md:
-        # без переходу через Новий рік
-        stmt = select(Contact).where(
-            and_(
-                Contact.user_id == user.id,
-                func.to_char(Contact.birthday, "MM-DD").between(today_md, end_md),
+    updated = []
+    if pending:
+        table = Contact.__table__
+        data = values(
+            column("id", table.c.id.type),
+            *(column(name, table.c[name].type) for name in CONTACT_FIELDS),
+            name="data",
+        ).data(
+            [
+                (item.id, *(getattr(item, name) for name in CONTACT_FIELDS))
+                for item in (items[index] for index in pending.values())
+            ]
+        )
+        stmt = (
+            update(Contact)
+            .where(Contact.id == data.c.id, Contact.user_id == user.id)
+            .values({name: data.c[name] for name in CONTACT_FIELDS})
+            .returning(Contact)
+        )
+        updated = await _commit_bulk(stmt, db)
+        if updated:
+            await contacts_changed(user.id)
+
+    for contact in updated:
+        index = pending.pop(contact.id)
+        results[index] = _result(index, "updated", contact)
+    for contact_id, index in pending.items():  # видалений паралельно
+        results[index] = _result(
+            index, "not_found", contact_id=contact_id, detail=NOT_FOUND
+        )
+    return results  # type: ignore[return-value]
+
+
+# Пакетне видалення: один DELETE ... WHERE id = ANY(...) RETURNING id
+async def bulk_delete_contacts(
+    ids: List[int], user: User, db: AsyncSession
+) -> list[dict]:
+    deleted: set[int] = set()
+    if ids:
+        res = await db.execute(
+            delete(Contact)
+            .where(Contact.user_id == user.id, Contact.id.in_(list(set(ids))))
+            .returning(Contact.id)
+        )
+        deleted = set(res.scalars().all())
+        await db.commit()
+        if deleted:
+            await contacts_changed(user.id)
+
+    results = []
+    for index, contact_id in enumerate(ids):
+        if contact_id in deleted:
+            results.append(_result(index, "deleted", contact_id=contact_id))
+            deleted.discard(contact_id)  # повтор id у запиті - вже видалений
+        else:
+            results.append(
+                _result(index, "not_found", contact_id=contact_id, detail=NOT_FOUND)
             )
+    return results
+
+
+# Всі контакти користувача потоком (server-side cursor): частини по chunk рядків,
+# рядки - кортежі (id, *CONTACT_FIELDS), без ORM-об'єктів
+async def stream_contacts(user_id: int, db: AsyncSession, chunk: int = 1000):
+    stmt = (
+        select(Contact.id, *(getattr(Contact, name) for name in CONTACT_FIELDS))
+        .where(Contact.user_id == user_id)
+        .order_by(Contact.id)
+        .execution_options(yield_per=chunk)
+    )
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        yield rows
+
+
+# Пошук по імені, прізвищу та email з обов'язковим лімітом.
+# ranked=False: ILIKE '%q%', порядок за id.
+# ranked=True (pg_trgm): ще й нечіткий збіг (оператор %), порядок за similarity.
+# Повертає (контакти, ключ для наступної сторінки або None).
+async def search_contacts(
+    q: str,
+    user: User,
+    db: AsyncSession,
+    limit: int = 20,
+    after: list | None = None,
+    ranked: bool = False,
+) -> tuple[List[Contact], list | None]:
+    like = f"%{q}%"
+    fields = (Contact.first_name, Contact.last_name, Contact.email)
+    matches = [field.ilike(like) for field in fields]
+
+    if not ranked:
+        stmt = select(Contact).where(Contact.user_id == user.id, or_(*matches))
+        if after is not None:
+            stmt = stmt.where(Contact.id > after[0])
+        res = await db.execute(stmt.order_by(Contact.id).limit(limit))
+        contacts = list(res.scalars().all())
+        next_key = [contacts[-1].id] if len(contacts) == limit else None
+        return contacts, next_key
+
+    score = func.greatest(*(func.similarity(field, q) for field in fields))
+    matches += [field.op("%")(q) for field in fields]
+    stmt = select(Contact, score.label("score")).where(
+        Contact.user_id == user.id, or_(*matches)
+    )
+    if after is not None:
+        after_score = literal(after[0], Float)
+        stmt = stmt.where(
+            or_(score < after_score, and_(score == after_score, Contact.id > after[1]))
         )
+    res = await db.execute(stmt.order_by(score.desc(), Contact.id).limit(limit))
+    rows = res.all()
+    contacts = [row.Contact for row in rows]
+    next_key = [rows[-1].score, rows[-1].Contact.id] if len(rows) == limit else None
+    return contacts, next_key
+
+
+def _md(day: date) -> int:
+    return day.month * 100 + day.day
+
+
+# Умова "ДР у вікні [start, start + days]" через birthday_md (місяць*100 + день).
+# Вікно через Новий рік - два діапазони; 29 лютого в невисокосний рік
+# святкують 28 лютого, тож 229 додається, якщо таке 28 лютого потрапило у вікно.
+def birthday_window(start: date, days: int):
+    if days >= 365:
+        return Contact.birthday_md.is_not(None)  # вікно охоплює весь рік
+    end = start + timedelta(days=days)
+    start_md, end_md = _md(start), _md(end)
+
+    if start_md <= end_md:
+        conditions = [Contact.birthday_md.between(start_md, end_md)]
     else:
         # з переходом через Новий рік (наприклад, 28.12 → 05.01)
-        stmt = select(Contact).where(
-            and_(
-                Contact.user_id == user.id,
-                or_(
-                    func.to_char(Contact.birthday, "MM-DD") >= today_md,
-                    func.to_char(Contact.birthday, "MM-DD") <= end_md,
-                ),
-            )
-        )
+        conditions = [
+            Contact.birthday_md.between(start_md, 1231),
+            Contact.birthday_md.between(101, end_md),
+        ]
+
+    for year in {start.year, end.year}:
+        feb_28 = date(year, 2, 28)
+        if not isleap(year) and start <= feb_28 <= end:
+            conditions.append(Contact.birthday_md == 229)
+            break
+    return or_(*conditions)
 
+
+# Порядок "від найближчого": спершу до кінця року, потім після Нового року
+def birthday_order(start: date) -> tuple:
+    return (Contact.birthday_md < _md(start), Contact.birthday_md, Contact.id)
+
+
+# Список контактів з ДР в найбижчі N днів
+async def get_upcoming_birthdays(
+    days: int, user: User, db: AsyncSession, today: date | None = None
+):
+    today = today or date.today()
+    stmt = (
+        select(Contact)
+        .where(Contact.user_id == user.id, birthday_window(today, days))
+        .order_by(*birthday_order(today))
+    )
     res = await db.execute(stmt)
     return list(res.scalars().all())
@@ -4,6 +4,7 @@ from sqlalchemy import select, update
 
 from src.database.models import User
 from src.schemas import UserModel
+from src.services.cache import bump_token_version, invalidate_user
 
 
 async def get_user_by_email(email: str, db: AsyncSession) -> Optional[User]:
@@ -21,12 +22,6 @@ async def create_user(body: UserModel, password_hash: str, db: AsyncSession) ->
     return user
 
 
-async def update_token(user: User, token: Optional[str], db: AsyncSession) -> None:
-
-    await db.execute(update(User).where(User.id == user.id).values(refresh_token=token))
-    await db.commit()
-
-
 async def set_role(user_id: int, role: str, db: AsyncSession) -> Optional[User]:
 
     res = await db.execute(select(User).where(User.id == user_id))
@@ -38,6 +33,8 @@ async def set_role(user_id: int, role: str, db: AsyncSession) -> Optional[User]:
     db.add(user)  # <--
     await db.commit()
     await db.refresh(user)
+    await invalidate_user(user.email)
+    await bump_token_version(user.id)  # роль у виданих токенах застаріла
     return user
 
 
@@ -53,6 +50,7 @@ async def confirmed_email(email: str, db: AsyncSession):
         user.confirmed = True
         await db.commit()
         await db.refresh(user)
+        await invalidate_user(user.email)
         return user
     return None
 
@@ -62,6 +60,7 @@ async def update_avatar(email, url: str, db: AsyncSession) -> User:
     user.avatar = url
     await db.commit()
     await db.refresh(user)
+    await invalidate_user(user.email)
     return user
 
 
@@ -69,4 +68,14 @@ async def update_password(user: User, hashed_password: str, db: AsyncSession):
     user.password = hashed_password
     await db.commit()
     await db.refresh(user)
+    await invalidate_user(user.email)
+    await bump_token_version(user.id)
     return user
+
+
+# Перехешування з новою вартістю bcrypt (пароль не змінився - токени не відкликаємо)
+async def rehash_password(user: User, hashed_password: str, db: AsyncSession) -> None:
+    await db.execute(
+        update(User).where(User.id == user.id).values(password=hashed_password)
+    )
+    await db.commit()
@@ -1,15 +1,12 @@
-from datetime import datetime, timezone, timedelta
 from fastapi import (
     APIRouter,
     Depends,
     HTTPException,
     status,
-    BackgroundTasks,
     Request,
 )
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError, ExpiredSignatureError
 
 from src.database.db import get_db
 from src.schemas import (
@@ -19,11 +16,13 @@ from src.schemas import (
     TokenModel,
     RequestEmail,
     ResetPasswordModel,
+    LogoutModel,
 )
 from src.repository import users as repository_users
 from src.services.auth import auth_service
-from src.services.email import send_email
-from src.conf.config import settings
+from src.services.queue import enqueue_email
+from src.services.cache import bump_token_version
+from src.services.sessions import session_store
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -36,21 +35,19 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 async def signup(
     body: UserModel,
     request: Request,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     exist_user = await repository_users.get_user_by_email(body.email, db)
     if exist_user:
         raise HTTPException(status_code=409, detail="Account already exists")
 
-    password_hash = auth_service.get_password_hash(body.password)
+    password_hash = await auth_service.get_password_hash(body.password)
     new_user = await repository_users.create_user(body, password_hash, db)
 
     confirm_token = auth_service.create_email_token({"sub": new_user.email})
     confirm_link = f"{str(request.base_url)}api/auth/confirmed_email/{confirm_token}"
 
-    background_tasks.add_task(
-        send_email,
+    await enqueue_email(
         new_user.email,
         new_user.username or "user",
         confirm_link,
@@ -73,27 +70,45 @@ async def login(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email"
         )
-    if not auth_service.verify_password(form.password, user.password):
+    valid, new_hash = await auth_service.verify_and_update_password(
+        form.password, user.password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid password"
         )
+    if new_hash:
+        await repository_users.rehash_password(user, new_hash, db)
     if not user.confirmed:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Email not confirmed"
         )
 
-    access = await auth_service.create_access_token(data={"sub": user.email})
-    refresh = await auth_service.create_refresh_token(data={"sub": user.email})
-    await repository_users.update_token(user, refresh, db)
+    access = await auth_service.create_access_token(data={"sub": user.email}, user=user)
+    jti = await session_store.create(user.email)
+    refresh = await auth_service.create_refresh_token(
+        data={"sub": user.email, "jti": jti}
+    )
     return {"access_token": access, "refresh_token": refresh, "token_type": "bearer"}
 
 
 # --- LOGOUT ---
+# З refresh_token у тілі - завершує лише цю сесію (пристрій), без нього - всі.
 @router.post("/logout")
 async def logout(
-    user=Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)
+    body: LogoutModel | None = None,
+    user=Depends(auth_service.get_current_user),
 ):
-    await repository_users.update_token(user, None, db)  # refresh_token -> None
+    if body and body.refresh_token:
+        payload = auth_service.decode_refresh_token(body.refresh_token)
+        if payload["sub"] != user.email:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+            )
+        await session_store.revoke(user.email, payload["jti"])
+    else:
+        await session_store.revoke_all(user.email)
+    await bump_token_version(user.id)  # відкликаємо видані access-токени
     return {"message": "Successfully logged out"}
 
 
@@ -121,7 +136,6 @@ async def confirmed_email(token: str, db: AsyncSession = Depends(get_db)):
 async def resend_confirm_email(
     body: RequestEmail,
     request: Request,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     user = await repository_users.get_user_by_email(body.email, db)
@@ -141,8 +155,7 @@ async def resend_confirm_email(
     confirm_link = f"{str(request.base_url)}api/auth/confirmed_email/{confirm_token}"
 
     # відправляемо лист
-    background_tasks.add_task(
-        send_email,
+    await enqueue_email(
         user.email,
         user.username or "user",
         confirm_link,
@@ -153,6 +166,7 @@ async def resend_confirm_email(
 
 
 # --- REFRESH TOKEN ---
+# Ротація сесії повністю в Redis; користувач береться з кешу (без запису в users)
 @router.post("/refresh_token")
 async def refresh_token(data: dict, db: AsyncSession = Depends(get_db)):
     refresh_token = data.get("refresh_token")
@@ -161,35 +175,29 @@ async def refresh_token(data: dict, db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST, detail="Missing refresh token"
         )
 
-    try:
-        payload = jwt.decode(
-            refresh_token,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-        )
-        email: str | None = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
-            )
-    except JWTError:
+    payload = auth_service.decode_refresh_token(refresh_token)
+    email = payload["sub"]
+
+    new_jti = await session_store.rotate(email, payload["jti"])
+    if new_jti is None:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
 
-    user = await repository_users.get_user_by_email(email, db)
-    if user is None or user.refresh_token != refresh_token:
+    user = await auth_service.get_user_cached(email, db)
+    if user is None:
+        await session_store.revoke(email, new_jti)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
         )
 
-    access_token = await auth_service.create_access_token(data={"sub": user.email})
+    access_token = await auth_service.create_access_token(
+        data={"sub": user.email}, user=user
+    )
     new_refresh_token = await auth_service.create_refresh_token(
-        data={"sub": user.email}
+        data={"sub": user.email, "jti": new_jti}
     )
 
-    await repository_users.update_token(user, new_refresh_token, db)
-
     return {
         "access_token": access_token,
         "refresh_token": new_refresh_token,
@@ -202,28 +210,18 @@ async def refresh_token(data: dict, db: AsyncSession = Depends(get_db)):
 async def request_reset_password(
     body: RequestEmail,
     request: Request,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     user = await repository_users.get_user_by_email(body.email, db)
     if not user:
         return {"message": "If user exists, an email has been sent"}
 
-    reset_token = jwt.encode(
-        {
-            "sub": user.email,
-            "scope": "reset_password",
-            "exp": datetime.now(timezone.utc) + timedelta(hours=1),
-        },
-        settings.SECRET_KEY,
-        algorithm=settings.ALGORITHM,
-    )
+    reset_token = auth_service.create_reset_token({"sub": user.email})
 
     reset_link = f"{str(request.base_url)}api/auth/reset_password/{reset_token}"
     # print("RESET LINK:", reset_link)
 
-    background_tasks.add_task(
-        send_email,
+    await enqueue_email(
         user.email,
         user.username or "user",
         reset_link,
@@ -240,34 +238,9 @@ async def reset_password(
     body: ResetPasswordModel,
     db: AsyncSession = Depends(get_db),
 ):
-    try:
-        # print("Incoming token:", token)
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        # print("PAYLOAD:", payload)
-
-        if payload.get("scope") != "reset_password":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token scope"
-            )
-
-        email = payload.get("sub")
-        if not email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token payload"
-            )
-
-    except ExpiredSignatureError:
-        # print("Token expired")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Token expired"
-        )
-    except JWTError as e:
-        # print("JWT error:", e)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid token: {str(e)}"
-        )
+    email = await auth_service.get_email_from_token(
+        token, expected_scope="reset_password"
+    )
 
     try:
         user = await repository_users.get_user_by_email(email, db)
@@ -278,12 +251,13 @@ async def reset_password(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        user.password = auth_service.get_password_hash(body.new_password)
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        await repository_users.update_password(
+            user, await auth_service.get_password_hash(body.new_password), db
+        )
 
         # print("Password updated for", email)
+    except HTTPException:
+        raise
     except Exception as e:
         # print("DB error:", e)
         raise HTTPException(
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Path, Request, status
+from fastapi.responses import FileResponse, Response
+
+from src.services.storage import FileSystemStorage, avatar_storage
+
+
+router = APIRouter(prefix="/avatars", tags=["avatars"])
+
+# Ім'я = хеш вмісту, тож файл незмінний: кешуємо на рік без ревалідації
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}.jpg", summary="Avatar from local storage")
+async def get_avatar(
+    request: Request,
+    digest: str = Path(pattern=r"^[0-9a-f]{64}$"),
+):
+    if not isinstance(avatar_storage, FileSystemStorage):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    etag = f'"{digest}"'  # сильний ETag: вміст однозначно визначається хешем
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    path = avatar_storage.path_for(digest)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    # FileResponse віддає файл потоково (pathsend, якщо його підтримує ASGI-сервер)
+    return FileResponse(path, media_type="image/jpeg", headers=headers)
@@ -1,16 +1,50 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
+from datetime import date
+from typing import List, Literal, Optional
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    HTTPException,
+    Path,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
 from fastapi_limiter.depends import RateLimiter
 
 from src.database.db import get_db
 from src.repository import contacts as repo_contacts
-from src.schemas import ContactCreate, ContactUpdate, ContactResponse
-from src.database.models import User
-from src.services.auth import auth_service
+from src.schemas import (
+    ContactCreate,
+    ContactUpdate,
+    ContactResponse,
+    ContactBulkUpdateItem,
+    ContactBulkDelete,
+    ContactBulkItemResult,
+    ContactBulkResponse,
+    ContactImportReport,
+)
+from src.services.auth import auth_service, CurrentIdentity
+from src.services.pagination import encode_cursor, decode_cursor
+from src.services.digest import upcoming_birthdays
+from src.services.importer import check_upload_size, detect_format, import_contacts
+from src.services.exporter import MEDIA_TYPES, export_contacts
+from src.services.etags import contacts_etag, not_modified
+from src.services.cache import get_contacts_version
+from src.services.response_cache import response_cache, dump_json
+from src.services.serialization import contact_rows_json, json_response
+from src.conf.config import settings
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
+contacts_json = TypeAdapter(List[ContactResponse])
+contact_json = TypeAdapter(ContactResponse)
+
 
 @router.get(
     "/",
@@ -18,12 +52,44 @@ router = APIRouter(prefix="/contacts", tags=["contacts"])
     dependencies=[Depends(RateLimiter(times=50, seconds=60))],
 )  # ≤100 запітів за хвилину
 async def get_contacts(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    sort: Literal["id", "name"] = Query("id"),
+    cursor: Optional[str] = Query(
+        None, description="Value of X-Next-Cursor from the previous page"
+    ),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
-    return await repo_contacts.get_contacts(skip, limit, current_user, db)
+    types = repo_contacts.CURSOR_TYPES[sort]
+    after = decode_cursor(cursor, sort, types) if cursor else None
+    params = (skip, limit, sort, cursor)
+    version = await get_contacts_version(current_user.id)
+    etag = contacts_etag(current_user.id, version, "list", *params)
+    if cached := not_modified(request, response, etag):
+        return cached
+    key = response_cache.key("list", current_user.id, version, *params)
+    if cached := await response_cache.get("list", key, response):
+        return cached
+
+    # FAST_JSON: рядки-кортежі серіалізуються напряму (схема OpenAPI та сама)
+    fast = settings.FAST_JSON
+    contacts = await repo_contacts.get_contacts(
+        skip, limit, current_user, db, sort=sort, after=after, as_rows=fast
+    )
+    # повна сторінка - можливо, є наступна: віддаємо курсор у заголовку
+    if len(contacts) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            sort, repo_contacts.sort_values(contacts[-1], sort)
+        )
+    if key is None and not fast:
+        return contacts
+    body = contact_rows_json(contacts) if fast else dump_json(contacts_json, contacts)
+    if key is None:
+        return json_response(body, response)
+    return await response_cache.store("list", key, body, response)
 
 
 @router.get(
@@ -32,20 +98,165 @@ async def get_contacts(
     dependencies=[Depends(RateLimiter(times=50, seconds=60))],  # ≤50 запітів за хвилину
 )
 async def search_contacts(
+    response: Response,
     q: str = Query(..., description="Search by first name, last name, or email"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="Value of X-Next-Cursor from the previous page"
+    ),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
-    return await repo_contacts.search_contacts(q, current_user, db)
+    ranked = settings.CONTACT_SEARCH_TRGM
+    mode = "search:trgm" if ranked else "search"
+    types = repo_contacts.CURSOR_TYPES[mode]
+    after = decode_cursor(cursor, mode, types) if cursor else None
+    version = await get_contacts_version(current_user.id)
+    key = response_cache.key("search", current_user.id, version, mode, q, limit, cursor)
+    if cached := await response_cache.get("search", key, response):
+        return cached
+
+    contacts, next_key = await repo_contacts.search_contacts(
+        q, current_user, db, limit=limit, after=after, ranked=ranked
+    )
+    if next_key is not None:
+        response.headers["X-Next-Cursor"] = encode_cursor(mode, next_key)
+    if key is None:
+        return contacts
+    return await response_cache.store(
+        "search", key, dump_json(contacts_json, contacts), response
+    )
 
 
 @router.get("/upcoming-birthdays", response_model=List[ContactResponse])
 async def get_upcoming_birthdays(
-    days: int = 7,
+    request: Request,
+    response: Response,
+    days: int = Query(7, ge=0, le=366),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
-    return await repo_contacts.get_upcoming_birthdays(days, current_user, db)
+    # відповідь залежить і від дати: ETag і ключ кешу змінюються щодня
+    params = (days, date.today().isoformat())
+    version = await get_contacts_version(current_user.id)
+    etag = contacts_etag(current_user.id, version, "birthdays", *params)
+    if cached := not_modified(request, response, etag):
+        return cached
+    key = response_cache.key("birthdays", current_user.id, version, *params)
+    if cached := await response_cache.get("birthdays", key, response):
+        return cached
+
+    contacts = await upcoming_birthdays(days, current_user, db, version)
+    if key is None:
+        return contacts
+    return await response_cache.store(
+        "birthdays", key, dump_json(contacts_json, contacts), response
+    )
+
+
+def _check_bulk_size(items: list) -> None:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Too many items, max {settings.BULK_MAX_ITEMS} per request",
+        )
+
+
+def _bulk_response(results: list[dict], ok: str) -> ContactBulkResponse:
+    items = []
+    for r in results:
+        contact = r["contact"] and ContactResponse.model_validate(r["contact"])
+        items.append(ContactBulkItemResult(**{**r, "contact": contact}))
+    succeeded = sum(item.status == ok for item in items)
+    return ContactBulkResponse(
+        succeeded=succeeded, failed=len(items) - succeeded, results=items
+    )
+
+
+# Пакетні операції (маршрути /bulk оголошені до /{contact_id}).
+# Весь пакет - один SQL-запит в одній транзакції; помилки - по елементах.
+@router.post(
+    "/bulk",
+    response_model=ContactBulkResponse,
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # ≤5 запитів за хвилину
+)
+async def bulk_create_contacts(
+    body: List[ContactCreate],
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
+):
+    _check_bulk_size(body)
+    results = await repo_contacts.bulk_create_contacts(body, current_user, db)
+    return _bulk_response(results, "created")
+
+
+@router.put(
+    "/bulk",
+    response_model=ContactBulkResponse,
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # ≤5 запитів за хвилину
+)
+async def bulk_update_contacts(
+    body: List[ContactBulkUpdateItem],
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
+):
+    _check_bulk_size(body)
+    results = await repo_contacts.bulk_update_contacts(body, current_user, db)
+    return _bulk_response(results, "updated")
+
+
+@router.delete(
+    "/bulk",
+    response_model=ContactBulkResponse,
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # ≤5 запитів за хвилину
+)
+async def bulk_delete_contacts(
+    body: ContactBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
+):
+    _check_bulk_size(body.ids)
+    results = await repo_contacts.bulk_delete_contacts(body.ids, current_user, db)
+    return _bulk_response(results, "deleted")
+
+
+# Імпорт CSV/JSONL: файл читається частинами, рядки йдуть в БД через COPY
+@router.post(
+    "/import",
+    response_model=ContactImportReport,
+    dependencies=[Depends(RateLimiter(times=2, seconds=60))],  # ≤2 запити за хвилину
+)
+async def import_contacts_file(
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "jsonl"]] = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
+):
+    fmt = detect_format(format, file.filename)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Use a .csv or .jsonl file or the format parameter",
+        )
+    check_upload_size(file, settings.IMPORT_MAX_BYTES)
+    return await import_contacts(file.file, fmt, current_user.id, db)
+
+
+# Експорт усієї адресної книги потоком (пам'ять не залежить від кількості контактів)
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    dependencies=[Depends(RateLimiter(times=5, seconds=60))],  # ≤5 запитів за хвилину
+)
+async def export_contacts_file(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
+):
+    return StreamingResponse(
+        export_contacts(current_user.id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{format}"'},
+    )
 
 
 @router.get(
@@ -54,16 +265,30 @@ async def get_upcoming_birthdays(
     dependencies=[Depends(RateLimiter(times=50, seconds=60))],  # ≤50 запітів за хвилину
 )
 async def get_contact(
+    request: Request,
+    response: Response,
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
+    version = await get_contacts_version(current_user.id)
+    etag = contacts_etag(current_user.id, version, "contact", contact_id)
+    if cached := not_modified(request, response, etag):
+        return cached
+    key = response_cache.key("contact", current_user.id, version, contact_id)
+    if cached := await response_cache.get("contact", key, response):
+        return cached
+
     contact = await repo_contacts.get_contact(contact_id, current_user, db)
     if not contact:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
-    return contact
+    if key is None:
+        return contact
+    return await response_cache.store(
+        "contact", key, dump_json(contact_json, contact), response
+    )
 
 
 @router.post(
@@ -76,7 +301,7 @@ async def get_contact(
 async def create_contact(
     body: ContactCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
     return await repo_contacts.create_contact(body, current_user, db)
 
@@ -86,7 +311,7 @@ async def update_contact(
     body: ContactUpdate,
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
     contact = await repo_contacts.update_contact(contact_id, body, current_user, db)
     if not contact:
@@ -104,7 +329,7 @@ async def update_contact(
 async def delete_contact(
     contact_id: int = Path(ge=1),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(auth_service.get_current_user),
+    current_user: CurrentIdentity = Depends(auth_service.get_current_identity),
 ):
     ok = await repo_contacts.delete_contact(contact_id, current_user, db)
     if not ok:
@@ -2,6 +2,12 @@ from sqlalchemy import text
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.database.db import get_db
+from src.services.cache import user_cache_stats, digest_stats
+from src.services.hashing import password_hasher
+from src.services.auth import auth_service
+from src.services.email import mailer
+from src.services.queue import email_queue
+from src.services.response_cache import response_cache
 
 
 router = APIRouter(prefix="/health", tags=["System"])
@@ -28,3 +34,16 @@ async def healthchecker(db: AsyncSession = Depends(get_db)):
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Database not available",
         )
+
+
+@router.get("/metrics", summary="Cache metrics of this worker")
+async def metrics():
+    return {
+        "user_cache": user_cache_stats(),
+        "birthday_digest": dict(digest_stats),
+        "response_cache": response_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_cache": auth_service.token_cache.stats(),
+        "mailer": mailer.stats(),
+        "email_queue": await email_queue.stats(),
+    }
@@ -2,7 +2,6 @@ from typing import List
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import cloudinary, cloudinary.uploader
 
 from src.database.db import get_db
 from src.database.models import User
@@ -10,8 +9,7 @@ from src.schemas import RoleUpdate, UserDb
 from src.repository.users import list_users, set_role
 from src.services.permissions import access_admin_only, Role
 from src.services.auth import auth_service
-from src.services.storage import upload_avatar
-from src.conf.config import settings
+from src.services.avatars import process_avatar
 from src.repository import users as repository_users
 
 
@@ -51,12 +49,8 @@ async def update_avatar(
     db: AsyncSession = Depends(get_db),
     current: User = Depends(auth_service.get_current_user),
 ):
-    if file.content_type not in ("image/png", "image/jpeg", "image/jpg", "image/webp"):
-        raise HTTPException(status_code=415, detail="Unsupported media type")
-    # url = await upload_avatar(file.file, public_id=f"user_{current.id}")
-    url = await upload_avatar(file.file, public_id=f"ContactsAPI/{current.username}")
-    current.avatar = url
-    await db.commit()
+    url = await process_avatar(file)
+    await repository_users.update_avatar(current.email, url, db)
     return {"avatar_url": url}
 
 
@@ -66,17 +60,6 @@ async def update_avatar_user(
     current_user: User = Depends(auth_service.get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    cloudinary.config(
-        cloud_name=settings.CLOUDINARY_NAME,
-        api_key=settings.CLOUDINARY_API_KEY,
-        api_secret=settings.CLOUDINARY_API_SECRET,
-        secure=True,
-    )
-    r = cloudinary.uploader.upload(
-        file.file, public_id=f"ContactsAPI/{current_user.username}", overwrite=True
-    )
-    src_url = cloudinary.CloudinaryImage(
-        f"ContactsAPI/{current_user.username}"
-    ).build_url(width=250, height=250, crop="fill", version=r.get("version"))
-    user = await repository_users.update_avatar(current_user.email, src_url, db)
+    url = await process_avatar(file)
+    user = await repository_users.update_avatar(current_user.email, url, db)
     return user
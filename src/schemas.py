@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import date, datetime
 
 
@@ -56,6 +56,17 @@ class TokenModel(BaseModel):
     token_type: str = "bearer"
 
 
+# Ідентичність з access-токена (stateless-режим), без завантаження User з БД
+class TokenIdentity(BaseModel):
+    id: int
+    email: EmailStr
+    role: str
+
+
+class LogoutModel(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class RequestEmail(BaseModel):
     email: EmailStr
 
@@ -91,6 +102,46 @@ class ContactResponse(ContactBase):
         from_attributes = True
 
 
+# -------- CONTACT BULK ----------
+class ContactBulkUpdateItem(ContactUpdate):
+    id: int = Field(ge=1)
+
+
+class ContactBulkDelete(BaseModel):
+    ids: List[int]
+
+
+class ContactBulkItemResult(BaseModel):
+    index: int  # позиція елемента в запиті
+    status: Literal[
+        "created", "updated", "deleted", "conflict", "not_found", "invalid"
+    ]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+    contact: Optional[ContactResponse] = None
+
+
+class ContactBulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[ContactBulkItemResult]
+
+
+# -------- CONTACT IMPORT ----------
+class ContactImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    detail: str
+
+
+class ContactImportReport(BaseModel):
+    rows: int
+    imported: int
+    invalid: int
+    conflicts: int
+    errors: List[ContactImportError]  # перші IMPORT_MAX_REPORTED_ERRORS
+
+
 # -------- DEBUG ----------
 class DebugEmailRequest(BaseModel):
     email: EmailStr
@@ -1,21 +1,33 @@
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Dict
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError, ExpiredSignatureError
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
 from src.database.db import get_db
 from src.database.models import User
+from src.schemas import TokenIdentity
 from src.repository import users as repository_users
-
-
-# --- crypto / oauth2 ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from src.services.cache import (
+    LocalTTLCache,
+    cache_user,
+    get_cached_user,
+    get_token_version,
+    get_user_version,
+)
+from src.services.hashing import password_hasher
+from src.services.tokens import TokenError, TokenExpiredError, get_codec
+
+
+# --- oauth2 ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Поточний користувач: повний User або TokenIdentity (stateless-режим)
+CurrentIdentity = User | TokenIdentity
+
 
 class AuthService:
     def __init__(self):
@@ -23,14 +35,22 @@ class AuthService:
         self.algorithm = settings.ALGORITHM
         self.access_token_expire_minutes = settings.ACCESS_EXPIRE_MIN
         self.refresh_token_expire_days = settings.REFRESH_EXPIRE_DAYS
+        self.codec = get_codec(settings.JWT_BACKEND)
+        # Кеш вже перевірених payload: ключ - sha256 токена, TTL - до його exp
+        self.token_cache = LocalTTLCache(maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=0)
+
 
+    # --- PASSWORD (bcrypt виконується поза event loop) ---
+    async def get_password_hash(self, password: str) -> str:
+        return await password_hasher.hash(password)
 
-    # --- PASSWORD ---
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
 
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_and_update_password(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await password_hasher.verify_and_update(plain_password, hashed_password)
     
 
     # --- TOKEN HELPERS ---
@@ -38,15 +58,21 @@ class AuthService:
         to_encode = data.copy()
         expire = datetime.now(timezone.utc) + expires_delta
         to_encode.update({"exp": expire, "iat": datetime.now(timezone.utc)})
-        token = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        token = self.codec.encode(to_encode, self.secret_key, self.algorithm)
         return token
 
-    async def create_access_token(self, data: dict) -> str:
+    async def create_access_token(self, data: dict, user: User | None = None) -> str:
+        # у stateless-режимі додаємо uid/role/ver, щоб перевіряти доступ без БД
+        if settings.STATELESS_AUTH and user is not None:
+            version = await get_token_version(user.id)
+            if version is not None:
+                data = {**data, "uid": user.id, "role": user.role, "ver": version}
         return self._create_token(
             data, timedelta(minutes=self.access_token_expire_minutes)
         )
 
     async def create_refresh_token(self, data: dict) -> str:
+        data = {**data, "scope": "refresh_token"}
         return self._create_token(data, timedelta(days=self.refresh_token_expire_days))
 
     def create_email_token(self, data: dict) -> str:
@@ -58,16 +84,48 @@ class AuthService:
         return self._create_token(data, timedelta(hours=1))
 
     def decode_token(self, token: str) -> Dict:
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self.token_cache.get(digest)
+        if cached is not None:
+            return dict(cached)
         try:
-            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-        except ExpiredSignatureError:
+            payload = self.codec.decode(token, self.secret_key, [self.algorithm])
+        except TokenExpiredError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
             )
-        except JWTError:
+        except TokenError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+            )
+        # refresh/email/reset токени мають scope і не приймаються як access
+        if payload.get("scope") is not None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            self.token_cache.set(digest, payload, ttl=exp - time.time())
+        return dict(payload)
+
+
+    # Refresh-токен: підпис + scope + sub/jti (наявність сесії перевіряє SessionStore)
+    def decode_refresh_token(self, token: str) -> Dict:
+        try:
+            payload = self.codec.decode(token, self.secret_key, [self.algorithm])
+        except TokenError:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+            )
+        if (
+            payload.get("scope") != "refresh_token"
+            or not payload.get("sub")
+            or not payload.get("jti")
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
+            )
+        return payload
 
 
     # --- CURRENT USER ---
@@ -75,21 +133,58 @@ class AuthService:
         self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
     ) -> User:
         payload = self.decode_token(token)
+        return await self._user_from_payload(payload, db)
+
+    # Для маршрутів, яким потрібні лише id/email/role.
+    # У stateless-режимі перевіряє версію токена через кеш і не читає User з БД;
+    # для токенів без uid/ver (або без Redis) - звичайний get_current_user.
+    async def get_current_identity(
+        self, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+    ) -> CurrentIdentity:
+        payload = self.decode_token(token)
+        if settings.STATELESS_AUTH and "uid" in payload and "ver" in payload:
+            version = await get_token_version(payload["uid"])
+            if version is not None:
+                if version != payload["ver"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Token revoked",
+                    )
+                return TokenIdentity(
+                    id=payload["uid"], email=payload["sub"], role=payload["role"]
+                )
+        return await self._user_from_payload(payload, db)
+
+    async def _user_from_payload(self, payload: Dict, db: AsyncSession) -> User:
         email: str | None = payload.get("sub")
         if email is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload"
             )
-        user = await repository_users.get_user_by_email(email, db)
+        user = await self.get_user_cached(email, db)
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
             )
         return user
 
+    # Read-through кеш: спочатку Redis, при промаху - БД і запис у кеш.
+    # Версія читається до БД: зміна під час читання не лишає в кеші старий рядок.
+    # Повертає від'єднаний User (без пароля) - для змін у БД
+    # використовуйте функції repository_users, вони ж скидають кеш.
+    async def get_user_cached(self, email: str, db: AsyncSession) -> User | None:
+        user = await get_cached_user(email)
+        if user is not None:
+            return user
+        version = await get_user_version(email)
+        user = await repository_users.get_user_by_email(email, db)
+        if user is not None and version is not None:
+            await cache_user(user, version)
+        return user
+
     async def get_email_from_token(self, token: str, expected_scope: str) -> str:
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = self.codec.decode(token, self.secret_key, [self.algorithm])
             if payload.get("scope") != expected_scope:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token scope"
@@ -98,9 +193,9 @@ class AuthService:
             if not email:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token payload")
             return email
-        except ExpiredSignatureError:
+        except TokenExpiredError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token expired")
-        except JWTError:
+        except TokenError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid token")
 
 
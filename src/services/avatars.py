@@ -0,0 +1,78 @@
+import asyncio
+import hashlib
+import io
+import logging
+import redis.asyncio as redis
+from fastapi import HTTPException, UploadFile, status
+from PIL import Image, ImageOps
+
+from src.conf.config import settings
+from src.services.cache import redis_client
+from src.services.storage import avatar_storage
+
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_TYPES = ("image/png", "image/jpeg", "image/jpg", "image/webp")
+AVATAR_SIZE = (250, 250)
+CHUNK_SIZE = 64 * 1024
+DEDUP_EXPIRE_SECONDS = 30 * 24 * 60 * 60
+
+
+# Читання файлу частинами з перевіркою розміру (без буферизації зайвого)
+async def read_limited(file: UploadFile, max_bytes: int) -> bytes:
+    buf = bytearray()
+    while chunk := await file.read(CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Avatar is larger than {max_bytes} bytes",
+            )
+    return bytes(buf)
+
+
+# Кроп до 250x250 + JPEG (CPU-робота, виконується в потоці).
+# Файл, який Pillow не може декодувати, не зберігається - 400.
+def resize_avatar(data: bytes) -> bytes:
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)
+            img = ImageOps.fit(img.convert("RGB"), AVATAR_SIZE)
+            out = io.BytesIO()
+            img.save(out, format="JPEG", quality=85, optimize=True)
+            return out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid image file"
+        )
+
+
+# Повний цикл: перевірка -> читання -> дедуплікація -> ресайз -> збереження
+async def process_avatar(file: UploadFile) -> str:
+    if file.content_type not in ALLOWED_TYPES:
+        raise HTTPException(status_code=415, detail="Unsupported media type")
+
+    data = await read_limited(file, settings.AVATAR_MAX_BYTES)
+    digest = hashlib.sha256(data).hexdigest()
+    # сховище в ключі: URL іншого бекенда після зміни AVATAR_STORAGE не годиться
+    key = f"avatar:{settings.AVATAR_STORAGE}:{digest}"
+
+    # такий самий файл уже завантажували - повертаємо готовий URL
+    try:
+        url = await redis_client.get(key)
+    except redis.RedisError as err:
+        logger.warning(f"Avatar dedup lookup failed: {err}")
+        url = None
+    if url and await avatar_storage.exists(url):
+        logger.info(f"Avatar {digest} already stored, upload skipped")
+        return url
+
+    resized = await asyncio.to_thread(resize_avatar, data)
+    url = await avatar_storage.save(resized, digest)
+
+    try:
+        await redis_client.set(key, url, ex=DEDUP_EXPIRE_SECONDS)
+    except redis.RedisError as err:
+        logger.warning(f"Avatar dedup store failed: {err}")
+    return url
@@ -1,9 +1,14 @@
+import asyncio
 import json
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Hashable
 import redis.asyncio as redis
 import logging
 
 from src.conf.config import settings
-from src.schemas import UserResponse
+from src.database.models import User
 
 
 logger = logging.getLogger(__name__)
@@ -16,32 +21,404 @@ redis_client = redis.Redis(
 )
 
 CACHE_EXPIRE_SECONDS = 300  # 5 хвилин
+DIGEST_EXPIRE_SECONDS = 2 * 24 * 60 * 60  # дайджест живе до наступного запуску
+VERSION_EXPIRE_SECONDS = 30 * 24 * 60 * 60  # версії неактивного користувача
+USER_INVALIDATE_CHANNEL = "user:invalidate"
 
 
-# Функція для кешування користувача
-async def cache_user(user):
-    key = f"user:{user.email}"
-    value = json.dumps(
-        {
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "created_at": str(user.created_at),  # стр для JSON
-            "avatar": user.avatar,
-            "role": user.role,
+# Обмежений in-process LRU кеш з TTL (окремий для кожного uvicorn-воркера)
+class LocalTTLCache:
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
         }
-    )
-    await redis_client.set(key, value, ex=CACHE_EXPIRE_SECONDS)
-    logger.info(f"USER cached in Redis (set): {user.email}")
-
-
-# Функція для отримання користувача з кешу
-async def get_cached_user(email: str):
-    key = f"user:{email}"
-    value = await redis_client.get(key)
-    if value:
-        data = json.loads(value)
-        # повертаємо Pydantic модель
-        logger.info(f"USER fetched from Redis (get): {email}")
-        return UserResponse(**data)
-    return None
+
+
+# Перший рівень кешу користувачів (перед Redis)
+local_users = LocalTTLCache(
+    maxsize=settings.USER_CACHE_LOCAL_MAXSIZE, ttl=settings.USER_CACHE_LOCAL_TTL
+)
+# Версії токенів користувачів (stateless-авторизація), коротке TTL
+local_token_versions = LocalTTLCache(
+    maxsize=settings.USER_CACHE_LOCAL_MAXSIZE, ttl=settings.TOKEN_VERSION_CACHE_TTL
+)
+# Лічильники другого рівня (Redis)
+redis_stats = {"hits": 0, "misses": 0}
+# Лічильники дайджесту днів народження
+digest_stats = {"hits": 0, "misses": 0}
+
+
+def _user_key(email: str) -> str:
+    return f"user:{email}"
+
+
+def _user_version_key(email: str) -> str:
+    return f"user:ver:{email}"
+
+
+def _token_version_key(user_id: int) -> str:
+    return f"user:tv:{user_id}"
+
+
+def _digest_key(user_id: int) -> str:
+    return f"birthdays:{user_id}"
+
+
+def _contacts_version_key(user_id: int) -> str:
+    return f"contacts:ver:{user_id}"
+
+
+# Версії (контактів, токенів) - час Redis у мкс: нова версія = max(стара + 1, TIME).
+# Після втрати ключа (TTL, FLUSHALL) версії не повторюються, і старі ETag/ключі
+# кешу не оживають; версія < t означає, що останню зміну зафіксовано до моменту t.
+_NOW_US_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000000 + tonumber(t[2])
+"""
+_GET_VERSION_LUA = _NOW_US_LUA + """
+local version = redis.call('GET', KEYS[1])
+if not version then
+    version = string.format('%.0f', now)
+    redis.call('SET', KEYS[1], version, 'EX', ARGV[1])
+end
+return version
+"""
+_BUMP_VERSION_LUA = _NOW_US_LUA + """
+local current = tonumber(redis.call('GET', KEYS[1])) or 0
+local version = string.format('%.0f', math.max(current + 1, now))
+redis.call('SET', KEYS[1], version, 'EX', ARGV[1])
+return version
+"""
+# Запис у кеш, лише якщо версія не змінилась з моменту читання з БД
+_SET_IF_VERSION_LUA = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+_get_version = redis_client.register_script(_GET_VERSION_LUA)
+_bump_version = redis_client.register_script(_BUMP_VERSION_LUA)
+_set_if_version = redis_client.register_script(_SET_IF_VERSION_LUA)
+
+
+# Поточний час Redis (мкс) - той самий годинник, що й у версій
+async def redis_time_us() -> int:
+    seconds, microseconds = await redis_client.time()
+    return seconds * 1_000_000 + microseconds
+
+
+# Версія запису користувача: читається до запиту в БД і передається в cache_user.
+# None - Redis недоступний, тоді користувач не кешується.
+async def get_user_version(email: str) -> int | None:
+    try:
+        value = await _get_version(
+            keys=[_user_version_key(email)], args=[VERSION_EXPIRE_SECONDS]
+        )
+    except redis.RedisError as err:
+        logger.warning(f"USER version get failed for {email}: {err}")
+        return None
+    return int(value)
+
+
+# Функція для кешування користувача
+# (пароль і refresh_token у кеш не потрапляють).
+# version - з get_user_version до читання з БД: якщо invalidate_user встиг
+# змінити версію, прочитаний рядок застарів і в кеш не потрапляє.
+async def cache_user(user: User, version: int) -> None:
+    data = {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+        "avatar": user.avatar,
+        "role": user.role,
+        "confirmed": user.confirmed,
+    }
+    # локальний рівень - до Redis: invalidate_user чистить його вже після зміни версії
+    local_users.set(user.email, data)
+    value = json.dumps(data)
+    try:
+        stored = await _set_if_version(
+            keys=[_user_version_key(user.email), _user_key(user.email)],
+            args=[version, value, CACHE_EXPIRE_SECONDS],
+        )
+    except redis.RedisError as err:
+        local_users.pop(user.email)
+        logger.warning(f"USER cache set failed for {user.email}: {err}")
+        return
+    if not stored:
+        local_users.pop(user.email)
+        logger.debug(f"USER cache set skipped, changed during read: {user.email}")
+        return
+    logger.debug(f"USER cached in Redis (set): {user.email}")
+
+
+def _user_from_data(data: dict) -> User:
+    data = dict(data)
+    if data.get("created_at"):
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return User(**data)
+
+
+# Функція для отримання користувача з кешу: спочатку пам'ять воркера, потім Redis
+# Повертає від'єднаний (detached) User без пароля, або None
+async def get_cached_user(email: str) -> User | None:
+    data = local_users.get(email)
+    if data is not None:
+        return _user_from_data(data)
+
+    try:
+        value = await redis_client.get(_user_key(email))
+    except redis.RedisError as err:
+        logger.warning(f"USER cache get failed for {email}: {err}")
+        return None
+    if not value:
+        redis_stats["misses"] += 1
+        return None
+
+    redis_stats["hits"] += 1
+    data = json.loads(value)
+    local_users.set(email, data)
+    logger.debug(f"USER fetched from Redis (get): {email}")
+    return _user_from_data(data)
+
+
+# Скидання кешу користувача (викликається з усіх write-шляхів repository/users.py).
+# Спочатку версія (паралельний cache_user зі старим рядком уже не запише),
+# потім ключ і локальний рівень; інші воркери отримують подію через pub/sub.
+async def invalidate_user(email: str) -> None:
+    try:
+        await _bump_version(
+            keys=[_user_version_key(email)], args=[VERSION_EXPIRE_SECONDS]
+        )
+    except redis.RedisError as err:
+        logger.warning(f"USER version bump failed for {email}: {err}")
+        try:
+            await redis_client.delete(_user_version_key(email))
+        except redis.RedisError as err:
+            logger.error(f"USER version reset failed for {email}: {err}")
+    try:
+        await redis_client.delete(_user_key(email))
+        await redis_client.publish(USER_INVALIDATE_CHANNEL, email)
+    except redis.RedisError as err:
+        logger.warning(f"USER cache invalidate failed for {email}: {err}")
+        return
+    finally:
+        local_users.pop(email)
+    logger.debug(f"USER cache invalidated: {email}")
+
+
+# Поточна версія токенів користувача. Відсутній ключ не означає 0: версія
+# засівається поточним часом, інакше після втрати ключа (TTL, FLUSHALL)
+# відкликані токени з ver=0 знову стали б дійсними.
+# None - Redis недоступний, тоді виклик має перейти на перевірку через БД.
+async def get_token_version(user_id: int) -> int | None:
+    version = local_token_versions.get(user_id)
+    if version is not None:
+        return version
+    try:
+        value = await _get_version(
+            keys=[_token_version_key(user_id)], args=[VERSION_EXPIRE_SECONDS]
+        )
+    except redis.RedisError as err:
+        logger.warning(f"Token version get failed for user {user_id}: {err}")
+        return None
+    version = int(value)
+    local_token_versions.set(user_id, version)
+    return version
+
+
+# Відкликання всіх виданих access-токенів користувача. Якщо збільшити версію
+# не вдалося - ключ видаляється: наступне читання засіє версію поточним часом
+async def bump_token_version(user_id: int) -> None:
+    key = _token_version_key(user_id)
+    local_token_versions.pop(user_id)
+    try:
+        await _bump_version(keys=[key], args=[VERSION_EXPIRE_SECONDS])
+    except redis.RedisError as err:
+        logger.warning(f"Token version bump failed for user {user_id}: {err}")
+        try:
+            await redis_client.delete(key)
+        except redis.RedisError as err:
+            logger.error(f"Token version reset failed for user {user_id}: {err}")
+    try:
+        await redis_client.publish(USER_INVALIDATE_CHANNEL, f"tv:{user_id}")
+    except redis.RedisError as err:
+        logger.warning(f"Token version publish failed for user {user_id}: {err}")
+
+
+# Фонова задача воркера: слухає канал інвалідації і чистить локальний кеш
+async def listen_invalidations() -> None:
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(USER_INVALIDATE_CHANNEL)
+            # поки підписки не було, могли пропустити події - скидаємо все
+            local_users.clear()
+            local_token_versions.clear()
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = message["data"]
+                if data.startswith("tv:"):
+                    local_token_versions.pop(int(data[3:]))
+                else:
+                    local_users.pop(data)
+        except asyncio.CancelledError:
+            raise
+        except redis.RedisError as err:
+            logger.warning(f"USER invalidation listener error: {err}")
+            local_users.clear()
+            local_token_versions.clear()
+            await asyncio.sleep(1)
+        finally:
+            await pubsub.aclose()
+
+
+# Дайджест днів народження користувача за сьогодні (список словників контактів).
+# version - версія контактів, прочитана до запиту в БД: дайджест, збудований
+# з іншої версії (контакти змінились під час його побудови), - промах.
+# None - дайджесту немає, він застарів або Redis недоступний.
+async def get_birthday_digest(
+    user_id: int, today: date, version: int | None
+) -> list[dict] | None:
+    if version is None:
+        return None
+    try:
+        value = await redis_client.get(_digest_key(user_id))
+    except redis.RedisError as err:
+        logger.warning(f"Birthday digest get failed for user {user_id}: {err}")
+        return None
+    data = json.loads(value) if value else None
+    if (
+        data is None
+        or data["date"] != today.isoformat()
+        or data.get("version") != version
+    ):
+        digest_stats["misses"] += 1
+        return None
+    digest_stats["hits"] += 1
+    return data["contacts"]
+
+
+# Запис дайджестів пачкою: {user_id: (версія контактів до запиту, [контакти])}
+async def store_birthday_digests(
+    digests: dict[int, tuple[int, list[dict]]], today: date
+) -> None:
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id, (version, contacts) in digests.items():
+                data = {"date": today.isoformat(), "version": version}
+                value = json.dumps({**data, "contacts": contacts})
+                pipe.set(_digest_key(user_id), value, ex=DIGEST_EXPIRE_SECONDS)
+            await pipe.execute()
+    except redis.RedisError as err:
+        logger.warning(f"Birthday digest store failed: {err}")
+
+
+# Версії контактів для дайджесту, збудованого запитом, що почався в момент started
+# (redis_time_us). Повертає тільки користувачів без змін після started - для решти
+# дайджест не пишеться (його збудує перший запит). Відсутня версія засівається
+# значенням started - 1: ключа немає, отже змін після started не було.
+async def get_digest_versions(user_ids: list[int], started: int) -> dict[int, int]:
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                key = _contacts_version_key(user_id)
+                pipe.set(key, started - 1, nx=True, ex=VERSION_EXPIRE_SECONDS)
+                pipe.get(key)
+            values = (await pipe.execute())[1::2]
+    except redis.RedisError as err:
+        logger.warning(f"Birthday digest versions get failed: {err}")
+        return {}
+    return {
+        user_id: int(value)
+        for user_id, value in zip(user_ids, values)
+        if int(value) < started
+    }
+
+
+# Скидання дайджесту (через contacts_changed - з усіх write-шляхів контактів)
+async def invalidate_birthday_digest(user_id: int) -> None:
+    try:
+        await redis_client.delete(_digest_key(user_id))
+    except redis.RedisError as err:
+        logger.warning(f"Birthday digest invalidate failed for user {user_id}: {err}")
+
+
+# Версія контактів користувача (для ETag і кешу відповідей).
+# None - Redis недоступний, тоді умовні запити просто не обробляються.
+async def get_contacts_version(user_id: int) -> int | None:
+    try:
+        value = await _get_version(
+            keys=[_contacts_version_key(user_id)], args=[VERSION_EXPIRE_SECONDS]
+        )
+    except redis.RedisError as err:
+        logger.warning(f"Contacts version get failed for user {user_id}: {err}")
+        return None
+    return int(value)
+
+
+# Контакти користувача змінились (всі write-шляхи repository/contacts.py та імпорт):
+# нова версія (ETag, кеш відповідей) і скидання дайджесту днів народження.
+# Якщо збільшити версію не вдалось - видаляємо її: наступне читання засіє нову
+# з поточного часу, і старі ETag/кеш не будуть віддаватись як актуальні.
+async def contacts_changed(user_id: int) -> None:
+    key = _contacts_version_key(user_id)
+    try:
+        await _bump_version(keys=[key], args=[VERSION_EXPIRE_SECONDS])
+    except redis.RedisError as err:
+        logger.warning(f"Contacts version bump failed for user {user_id}: {err}")
+        try:
+            await redis_client.delete(key)
+        except redis.RedisError as err:
+            logger.error(f"Contacts version reset failed for user {user_id}: {err}")
+    await invalidate_birthday_digest(user_id)
+
+
+def user_cache_stats() -> dict:
+    return {"local": local_users.stats(), "redis": dict(redis_stats)}
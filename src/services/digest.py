@@ -0,0 +1,198 @@
+import logging
+from calendar import isleap
+from datetime import date, datetime, timedelta
+
+import redis.asyncio as redis
+from sqlalchemy import select, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.db import session
+from src.database.models import Contact, User
+from src.repository import contacts as repo_contacts
+from src.schemas import ContactResponse
+from src.services.cache import (
+    redis_client,
+    redis_time_us,
+    get_birthday_digest,
+    get_digest_versions,
+    store_birthday_digests,
+)
+from src.services.email import send_emails
+
+
+logger = logging.getLogger(__name__)
+
+DIGEST_TEMPLATE = "birthday_digest_template.html"
+RUN_LOCK_SECONDS = 2 * 24 * 60 * 60
+STREAM_CHUNK = 1000
+
+
+# Скільки днів до найближчого ДР (29 лютого в невисокосний рік - 28 лютого)
+def days_until(birthday: date, today: date) -> int:
+    for year in (today.year, today.year + 1):
+        day = birthday.day
+        if (birthday.month, birthday.day) == (2, 29) and not isleap(year):
+            day = 28
+        upcoming = date(year, birthday.month, day)
+        if upcoming >= today:
+            return (upcoming - today).days
+    raise AssertionError("unreachable")
+
+
+# Контакти дайджесту: дані ContactResponse + in_days, від найближчого ДР
+def digest_entries(contacts: list[Contact], today: date) -> list[dict]:
+    entries = [
+        {
+            **ContactResponse.model_validate(c).model_dump(mode="json"),
+            "in_days": days_until(c.birthday, today),
+        }
+        for c in contacts
+    ]
+    entries.sort(key=lambda e: (e["in_days"], e["id"]))
+    return entries
+
+
+# Найближчі ДР для /api/contacts/upcoming-birthdays:
+# days <= BIRTHDAY_DIGEST_DAYS віддаються з дайджесту (Redis). Якщо дайджесту
+# немає (скинутий після зміни контактів) - один запит на вікно дайджесту і запис.
+# version - версія контактів (get_contacts_version), прочитана до запиту: якщо
+# контакти змінились, поки він виконувався, записаний дайджест має стару версію
+# і буде промахом.
+async def upcoming_birthdays(
+    days: int, user: User, db: AsyncSession, version: int | None
+) -> list:
+    if days > settings.BIRTHDAY_DIGEST_DAYS:
+        return await repo_contacts.get_upcoming_birthdays(days, user, db)
+
+    today = date.today()
+    entries = await get_birthday_digest(user.id, today, version)
+    if entries is None:
+        contacts = await repo_contacts.get_upcoming_birthdays(
+            settings.BIRTHDAY_DIGEST_DAYS, user, db, today=today
+        )
+        entries = digest_entries(contacts, today)
+        if version is not None:
+            await store_birthday_digests({user.id: (version, entries)}, today)
+    return [e for e in entries if e["in_days"] <= days]
+
+
+# Один запуск на добу навіть при кількох екземплярах планувальника
+async def _acquire_run(today: date) -> bool:
+    try:
+        return bool(
+            await redis_client.set(
+                f"birthdays:run:{today.isoformat()}", 1, nx=True, ex=RUN_LOCK_SECONDS
+            )
+        )
+    except redis.RedisError as err:
+        logger.error(f"Birthday digest lock failed: {err}")
+        return False
+
+
+# Після збою знімаємо блокування - дайджест можна перезапустити того ж дня
+async def _release_run(today: date) -> None:
+    try:
+        await redis_client.delete(f"birthdays:run:{today.isoformat()}")
+    except redis.RedisError as err:
+        logger.error(f"Birthday digest unlock failed: {err}")
+
+
+# redis_started - час Redis до початку запиту: користувачі, чиї контакти
+# змінились після нього, пропускаються (у batch можуть бути застарілі дані)
+async def _flush(
+    batch: list[tuple], today: date, stats: dict, redis_started: int
+) -> None:
+    versions = await get_digest_versions(
+        [user_id for user_id, *_ in batch], redis_started
+    )
+    await store_birthday_digests(
+        {
+            user_id: (versions[user_id], entries)
+            for user_id, _, _, entries in batch
+            if user_id in versions
+        },
+        today,
+    )
+    stats["users"] += len(batch)
+    stats["skipped"] += len(batch) - len(versions)
+
+    if not settings.BIRTHDAY_DIGEST_EMAILS:
+        return
+    link = f"{settings.APP_URL}api/contacts/upcoming-birthdays"
+    items = [
+        (email, username or email, link, DIGEST_TEMPLATE, {"contacts": entries})
+        for _, email, username, entries in batch
+        if email is not None and entries
+    ]
+    if not items:
+        return
+    results = await send_emails(items)
+    stats["emails"] += sum(error is None for error in results)
+    stats["email_errors"] += sum(error is not None for error in results)
+
+
+# Щоденний дайджест: один set-based запит по всіх користувачах (LEFT JOIN -
+# користувачі без найближчих ДР отримують порожній дайджест), результат
+# пишеться в Redis пачками, підтвердженим користувачам - лист-нагадування.
+async def run_digest(today: date | None = None, force: bool = False) -> dict | None:
+    today = today or date.today()
+    if not force and not await _acquire_run(today):
+        logger.info(f"Birthday digest for {today} already done, skipped")
+        return None
+    try:
+        return await _run_digest(today)
+    except Exception:
+        await _release_run(today)
+        raise
+
+
+async def _run_digest(today: date) -> dict:
+    started = datetime.now()
+    stats = {"users": 0, "skipped": 0, "contacts": 0, "emails": 0, "email_errors": 0}
+    stmt = (
+        select(User.id, User.email, User.username, User.confirmed, Contact)
+        .outerjoin(
+            Contact,
+            and_(
+                Contact.user_id == User.id,
+                repo_contacts.birthday_window(today, settings.BIRTHDAY_DIGEST_DAYS),
+            ),
+        )
+        .order_by(User.id)
+        .execution_options(yield_per=STREAM_CHUNK)
+    )
+
+    batch: list[tuple] = []
+    current: list | None = None  # [user_id, email, username, contacts]
+    redis_started = await redis_time_us()  # до знімка БД
+    async with session() as db:
+        result = await db.stream(stmt)
+        async for user_id, email, username, confirmed, contact in result:
+            if current is None or current[0] != user_id:
+                if current is not None:
+                    batch.append((*current[:3], digest_entries(current[3], today)))
+                    if len(batch) >= settings.BIRTHDAY_DIGEST_BATCH:
+                        await _flush(batch, today, stats, redis_started)
+                        batch = []
+                        db.expunge_all()  # оброблені контакти не тримаємо в сесії
+                current = [user_id, email if confirmed else None, username, []]
+            if contact is not None:
+                current[3].append(contact)
+                stats["contacts"] += 1
+        if current is not None:
+            batch.append((*current[:3], digest_entries(current[3], today)))
+    if batch:
+        await _flush(batch, today, stats, redis_started)
+
+    stats["seconds"] = round((datetime.now() - started).total_seconds(), 2)
+    logger.info(f"Birthday digest for {today}: {stats}")
+    return stats
+
+
+# Коли запускати наступний раз (сьогодні або завтра о BIRTHDAY_DIGEST_HOUR)
+def next_run(now: datetime) -> datetime:
+    run_at = now.replace(
+        hour=settings.BIRTHDAY_DIGEST_HOUR, minute=0, second=0, microsecond=0
+    )
+    return run_at if run_at > now else run_at + timedelta(days=1)
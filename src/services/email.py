@@ -1,9 +1,11 @@
-import os
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from email.message import EmailMessage
+from email.utils import formataddr
+import aiosmtplib
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from pydantic import EmailStr
 from src.conf.config import settings
 
@@ -14,20 +16,270 @@ logger = logging.getLogger(__name__)
 TMP_EMAIL_DIR = Path(__file__).resolve().parent.parent / "tmp_emails"
 TMP_EMAIL_DIR.mkdir(exist_ok=True)
 
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+MAIL_FROM_NAME = "Contacts API"
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=settings.MAIL_USERNAME,
-    MAIL_PASSWORD=settings.MAIL_PASSWORD,
-    MAIL_FROM=settings.MAIL_FROM,
-    MAIL_PORT=settings.MAIL_PORT,
-    MAIL_SERVER=settings.MAIL_SERVER,
-    MAIL_FROM_NAME="Contacts API",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).resolve().parent / "templates",
+templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,  # шаблони не перевіряються на диску при кожному рендері
 )
+_compiled: dict[str, Template] = {}
+
+
+# Завантаження і компіляція всіх шаблонів один раз (lifespan / worker.py)
+def preload_templates() -> None:
+    for name in templates.list_templates(extensions=["html"]):
+        _compiled[name] = templates.get_template(name)
+    logger.info(f"Email templates compiled: {sorted(_compiled)}")
+
+
+def _template(name: str) -> Template:
+    template = _compiled.get(name)
+    if template is None:
+        template = _compiled[name] = templates.get_template(name)
+    return template
+
+
+# Рендер без кешу: посилання містить новий JWT для кожного листа, тож кешувати
+# нічого - повторно використовуються лише скомпільовані шаблони (_compiled)
+def render_template(template_name: str, username: str, link: str) -> str:
+    return _template(template_name).render(
+        username=username, link=link, token=link.split("/")[-1]
+    )
+
+
+# Запис debug-листів (DEBUG_EMAILS) у tmp_emails/ фоновою задачею:
+# event loop лише кладе лист у чергу, файли пишуться пачками в потоці,
+# а найстаріші видаляються, щойно їх більше ніж max_files.
+class DebugSpool:
+
+    def __init__(self, directory: Path, max_files: int, batch_size: int = 50):
+        self.directory = directory
+        self.max_files = max_files
+        self.batch_size = batch_size
+        self._queue: asyncio.Queue[tuple[str, str, str, str]] = asyncio.Queue(
+            maxsize=1000
+        )
+        self._task: asyncio.Task | None = None
+        self.dropped = 0
+
+    def save(self, email: str, username: str, link: str, subject: str) -> None:
+        try:
+            self._queue.put_nowait((email, username, link, subject))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Debug email spool is full, email to {email} not saved")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        await self._queue.join()  # дописуємо те, що вже в черзі
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except OSError as err:
+                logger.error(f"Debug email spool write failed: {err}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[tuple[str, str, str, str]]) -> None:
+        for email, username, link, subject in batch:
+            stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            filename = self.directory / f"{stamp}_{email}.html"
+            with open(filename, "w", encoding="utf-8") as f:
+                f.write(f"<h2>{subject}</h2><p>Hello {username},</p>")
+                f.write(f"<p>Use this link: <a href='{link}'>{link}</a></p>")
+            logger.info(f"Email saved to {filename}")
+        self._rotate()
+
+    def _rotate(self) -> None:
+        files = sorted(self.directory.glob("*.html"))
+        for old in files[: max(0, len(files) - self.max_files)]:
+            old.unlink(missing_ok=True)
+
+
+# Довгоживучий SMTP-клієнт: пул з'єднань, що перевикористовуються між листами.
+# Одна сесія (TCP + STARTTLS + AUTH) надсилає до max_per_session листів,
+# при розриві з'єднання - перепідключення і повтор листа.
+class SMTPMailer:
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None,
+        password: str | None,
+        start_tls: bool = True,
+        use_tls: bool = False,
+        validate_certs: bool = True,
+        pool_size: int = 2,
+        max_per_session: int = 100,
+        timeout: float = 30,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.use_tls = use_tls
+        self.validate_certs = validate_certs
+        self.max_per_session = max_per_session
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.sent = 0
+        self.failed = 0
+        self.connects = 0
+        # слоти пулу: None - з'єднання ще не відкрите
+        self._pool: asyncio.Queue[tuple[aiosmtplib.SMTP, int] | None] = asyncio.Queue()
+        for _ in range(pool_size):
+            self._pool.put_nowait(None)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        client = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            use_tls=self.use_tls,
+            validate_certs=self.validate_certs,
+            timeout=self.timeout,
+        )
+        await client.connect()
+        self.connects += 1
+        return client
+
+    @staticmethod
+    async def _close(client: aiosmtplib.SMTP) -> None:
+        try:
+            if client.is_connected:
+                await client.quit()
+        except aiosmtplib.SMTPException:
+            client.close()
+
+    # Надсилає листи однією сесією; повертає помилку (або None) для кожного листа
+    async def send_batch(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        slot = await self._pool.get()
+        results: list[Exception | None] = []
+        try:
+            for message in messages:
+                slot, error = await self._send_one(slot, message)
+                results.append(error)
+        finally:
+            self._pool.put_nowait(slot)
+        return results
+
+    async def send(self, message: EmailMessage) -> None:
+        (error,) = await self.send_batch([message])
+        if error is not None:
+            raise error
+
+    async def _send_one(self, slot, message: EmailMessage):
+        for attempt in range(2):
+            try:
+                if slot is None or slot[1] >= self.max_per_session:
+                    if slot is not None:
+                        await self._close(slot[0])
+                    slot = None
+                    slot = (await self._connect(), 0)
+                await slot[0].send_message(message)
+                slot = (slot[0], slot[1] + 1)
+                self.sent += 1
+                return slot, None
+            except (aiosmtplib.SMTPServerDisconnected, ConnectionError) as err:
+                # з'єднання протухло - перепідключаємось і пробуємо ще раз
+                logger.warning(f"SMTP connection lost, reconnecting: {err}")
+                if slot is not None:
+                    slot[0].close()
+                slot = None
+                if attempt:
+                    self.failed += 1
+                    return slot, err
+            except (aiosmtplib.SMTPException, OSError) as err:
+                self.failed += 1
+                return slot, err
+        raise AssertionError("unreachable")
+
+    async def close(self) -> None:
+        drained = 0
+        while not self._pool.empty():
+            slot = self._pool.get_nowait()
+            drained += 1
+            if slot is not None:
+                await self._close(slot[0])
+        for _ in range(drained):
+            self._pool.put_nowait(None)
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "sent": self.sent,
+            "failed": self.failed,
+            "connects": self.connects,
+        }
+
+
+mailer = SMTPMailer(
+    hostname=settings.MAIL_SERVER,
+    port=settings.MAIL_PORT,
+    username=settings.MAIL_USERNAME,
+    password=settings.MAIL_PASSWORD,
+    pool_size=settings.MAIL_POOL_SIZE,
+    max_per_session=settings.MAIL_MAX_PER_SESSION,
+    timeout=settings.MAIL_TIMEOUT,
+)
+
+
+def _subject(template_name: str) -> str:
+    if "birthday" in template_name:
+        return "Upcoming birthdays"
+    return (
+        "Confirm your email" if "reset" not in template_name else "Reset your password"
+    )
+
+
+def build_message(
+    email: EmailStr,
+    username: str,
+    link: str,
+    template_name: str = "email_template.html",
+    context: dict | None = None,
+) -> EmailMessage:
+    if context:
+        # персональні дані (дайджест) - рендер без кешу
+        html = _template(template_name).render(username=username, link=link, **context)
+    else:
+        html = render_template(template_name, username, link)
+    message = EmailMessage()
+    message["From"] = formataddr((MAIL_FROM_NAME, settings.MAIL_FROM))
+    message["To"] = email
+    message["Subject"] = _subject(template_name)
+    message.set_content(html, subtype="html")
+    return message
+
+
+debug_spool = DebugSpool(TMP_EMAIL_DIR, max_files=settings.DEBUG_EMAILS_MAX_FILES)
+
+
+def _save_debug_email(email: str, username: str, link: str, subject: str) -> None:
+    debug_spool.save(email, username, link, subject)
 
 
 async def send_email(
@@ -41,36 +293,51 @@ async def send_email(
     - Якщо SMTP працює → лист іде. Якщо DEBUG_EMAILS=True → також зберігаємо у файл.
     - Якщо SMTP не працює → лог помилки, але якщо DEBUG_EMAILS=True → зберігаємо у файл.
     """
-    
-    subject = (
-        "Confirm your email" if "reset" not in template_name else "Reset your password"
-    )
 
-    message = MessageSchema(
-        subject=subject,
-        recipients=[email],
-        template_body={
-            "username": username,
-            "link": link,
-            "token": link.split("/")[-1],
-        },
-        subtype=MessageType.html,
-    )
-
-    fm = FastMail(conf)
     try:
-        await fm.send_message(message, template_name=template_name)
+        await mailer.send(build_message(email, username, link, template_name))
         logger.info(f"Email sent to {email} ({template_name})")
 
-    except ConnectionErrors as err:
+    except (aiosmtplib.SMTPException, OSError) as err:
         logger.error(f"Email sending failed: {err}")
 
     # Зберігаємо тільки якщо DEBUG_EMAILS=True
     if settings.DEBUG_EMAILS:
-        filename = (
-            TMP_EMAIL_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{email}.html"
-        )
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(f"<h2>{subject}</h2><p>Hello {username},</p>")
-            f.write(f"<p>Use this link: <a href='{link}'>{link}</a></p>")
-        logger.info(f"Email saved to {filename}")
+        _save_debug_email(email, username, link, _subject(template_name))
+
+
+async def deliver_email(
+    email: EmailStr,
+    username: str,
+    link: str,
+    template_name: str = "email_template.html",
+):
+    """
+    Відправка листа з черги (worker.py): помилка SMTP пробрасується далі,
+    щоб черга повторила задачу з backoff.
+    """
+
+    await mailer.send(build_message(email, username, link, template_name))
+    logger.info(f"Email sent to {email} ({template_name})")
+
+    if settings.DEBUG_EMAILS:
+        _save_debug_email(email, username, link, _subject(template_name))
+
+
+async def send_emails(
+    items: list[tuple],
+) -> list[Exception | None]:
+    """
+    Пакетна відправка: items - (email, username, link, template_name[, context]).
+    Листи йдуть однією SMTP-сесією; повертає помилку (або None) для кожного листа.
+    """
+
+    messages = [build_message(*item) for item in items]
+    results = await mailer.send_batch(messages)
+    for item, error in zip(items, results):
+        email, username, link, template_name = item[:4]
+        if error is not None:
+            logger.error(f"Email sending failed for {email}: {error}")
+        if settings.DEBUG_EMAILS:
+            _save_debug_email(email, username, link, _subject(template_name))
+    return results
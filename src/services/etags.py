@@ -0,0 +1,39 @@
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+# ETag відповіді для читання контактів: версія контактів користувача
+# (get_contacts_version) + маршрут і параметри запиту. Версія змінюється при
+# кожному записі (contacts_changed), тож той самий ETag означає ту саму
+# відповідь. None - версія невідома (Redis недоступний).
+def contacts_etag(user_id: int, version: int | None, *parts) -> str | None:
+    if version is None:
+        return None
+    key = ":".join(str(part) for part in (user_id, version, *parts))
+    return f'W/"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+# Умовний GET: ставить ETag у відповідь; якщо клієнт уже має цю версію -
+# повертає готову 304 (маршрут віддає її одразу, без запиту до БД і серіалізації)
+def not_modified(request: Request, response: Response, etag: str | None):
+    if etag is None:
+        return None
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+        )
+    return None
@@ -0,0 +1,43 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from src.conf.config import settings
+from src.database.db import session
+from src.repository import contacts as repo_contacts
+
+
+FIELDS = ("id", *repo_contacts.CONTACT_FIELDS)
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _ndjson(rows) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(FIELDS, row)), default=str, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _csv(rows, header: bool) -> bytes:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(FIELDS)
+    writer.writerows(rows)
+    return buf.getvalue().encode()
+
+
+# Експорт адресної книги потоком: одна частина курсора -> один шматок відповіді.
+# Власна сесія: yield-залежність get_db закривається до того, як StreamingResponse
+# почне віддавати тіло, тож сесія живе рівно стільки, скільки генератор.
+async def export_contacts(user_id: int, fmt: str) -> AsyncIterator[bytes]:
+    header = True
+    async with session() as db:
+        async for rows in repo_contacts.stream_contacts(
+            user_id, db, chunk=settings.EXPORT_CHUNK_ROWS
+        ):
+            yield _csv(rows, header) if fmt == "csv" else _ndjson(rows)
+            header = False
+    if header and fmt == "csv":
+        yield _csv([], header)  # порожня книга - лише заголовок
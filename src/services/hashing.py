@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from src.conf.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# Контекст на кожну вартість bcrypt (rounds); хеші з іншою вартістю -> needs_update
+@lru_cache(maxsize=None)
+def _context(rounds: int) -> CryptContext:
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+# Функції верхнього рівня - щоб їх можна було передати і в ProcessPoolExecutor
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str, rounds: int) -> bool:
+    return _context(rounds).verify(plain_password, hashed_password)
+
+
+def _verify_and_update(
+    plain_password: str, hashed_password: str, rounds: int
+) -> tuple[bool, str | None]:
+    return _context(rounds).verify_and_update(plain_password, hashed_password)
+
+
+# Виконує bcrypt у пулі потоків/процесів, щоб не блокувати event loop.
+# Кількість одночасних хешувань обмежена розміром пулу, а черга - max_pending:
+# якщо черга переповнена, запит одразу отримує 503 замість очікування.
+class PasswordHasher:
+
+    def __init__(
+        self, rounds: int, workers: int, max_pending: int, use_processes: bool = False
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            logger.warning(f"Password hasher queue is full ({self.in_flight})")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, try again later",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify, plain_password, hashed_password, self.rounds)
+
+    # (чи вірний пароль, новий хеш - якщо вартість bcrypt змінилась, інакше None)
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._run(
+            _verify_and_update, plain_password, hashed_password, self.rounds
+        )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "executor": "process" if self.use_processes else "thread",
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    rounds=settings.BCRYPT_ROUNDS,
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    use_processes=settings.PASSWORD_HASH_EXECUTOR == "process",
+)
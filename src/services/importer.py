@@ -0,0 +1,225 @@
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import os
+from itertools import islice
+from typing import BinaryIO, Iterator
+
+from fastapi import HTTPException, UploadFile, status
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.conf.config import settings
+from src.database.models import Contact
+from src.schemas import ContactBase
+from src.services.cache import contacts_changed
+
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+STAGING_TABLE = "contacts_import"
+COLUMNS = ("line", "first_name", "last_name", "email", "phone", "birthday", "extra")
+# Максимальна довжина рядкових полів - з моделі (VARCHAR(n) у contacts)
+MAX_LENGTHS = {
+    name: Contact.__table__.c[name].type.length
+    for name in ("first_name", "last_name", "email", "phone", "extra")
+}
+
+
+# Формат за параметром або розширенням файлу
+def detect_format(fmt: str | None, filename: str | None) -> str | None:
+    if fmt:
+        return fmt if fmt in FORMATS else None
+    suffix = (filename or "").rsplit(".", 1)[-1].lower()
+    return {"csv": "csv", "jsonl": "jsonl", "ndjson": "jsonl"}.get(suffix)
+
+
+# Перевірка розміру завантаженого файлу (він уже на диску - читати не потрібно)
+def check_upload_size(file: UploadFile, max_bytes: int) -> None:
+    size = file.size
+    if size is None:
+        size = file.file.seek(0, os.SEEK_END)
+        file.file.seek(0)
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Import file is larger than {max_bytes} bytes",
+        )
+
+
+# Потокове читання файлу: (номер рядка, dict | текст помилки), файл не читається цілком
+def iter_records(file: BinaryIO, fmt: str) -> Iterator[tuple[int, dict | str]]:
+    lines = codecs.getreader("utf-8-sig")(file, errors="replace")
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {k: v for k, v in row.items() if k is not None}
+        return
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as err:
+            yield line_num, f"Invalid JSON: {err.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_num, "JSON object expected"
+            continue
+        yield line_num, record
+
+
+def _validate(line: int, record: dict) -> tuple | str:
+    record = {k: (v if v != "" else None) for k, v in record.items()}
+    try:
+        contact = ContactBase.model_validate(record)
+    except ValidationError as err:
+        first = err.errors()[0]
+        loc = ".".join(str(part) for part in first["loc"])
+        return f"{loc}: {first['msg']}" if loc else first["msg"]
+    for name, length in MAX_LENGTHS.items():
+        value = getattr(contact, name)
+        if value is not None and len(value) > length:
+            return f"{name}: longer than {length} characters"
+    return (
+        line,
+        contact.first_name,
+        contact.last_name,
+        contact.email,
+        contact.phone,
+        contact.birthday,
+        contact.extra,
+    )
+
+
+class ImportReport:
+
+    def __init__(self, max_errors: int):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.invalid = 0
+        self.conflicts = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, detail: str, email: str | None = None) -> None:
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "email": email, "detail": detail})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "invalid": self.invalid,
+            "conflicts": self.conflicts,
+            "errors": self.errors,
+        }
+
+
+_CREATE_STAGING = f"""
+CREATE TEMP TABLE {STAGING_TABLE} (
+    line integer NOT NULL,
+    first_name varchar NOT NULL,
+    last_name varchar NOT NULL,
+    email varchar NOT NULL,
+    phone varchar NOT NULL,
+    birthday date NOT NULL,
+    extra varchar
+) ON COMMIT DROP
+"""
+
+# Повтори email у файлі: лишається перший рядок, решта - конфлікти.
+# Обидва запити повертають перші :max_errors рядків і загальну кількість.
+_DROP_DUPLICATES = f"""
+WITH dropped AS (
+    DELETE FROM {STAGING_TABLE} a USING {STAGING_TABLE} b
+    WHERE a.email = b.email AND a.line > b.line
+    RETURNING a.line, a.email
+)
+SELECT line, email, count(*) OVER () FROM dropped ORDER BY line LIMIT :max_errors
+"""
+
+# Злиття в contacts одним запитом; повертає рядки, що не вставились (email зайнятий)
+_MERGE = f"""
+WITH inserted AS (
+    INSERT INTO contacts (first_name, last_name, email, phone, birthday, extra, user_id)
+    SELECT first_name, last_name, email, phone, birthday, extra, :user_id
+    FROM {STAGING_TABLE} ORDER BY line
+    ON CONFLICT (email) DO NOTHING
+    RETURNING email
+)
+SELECT s.line, s.email, count(*) OVER ()
+FROM {STAGING_TABLE} s
+WHERE NOT EXISTS (SELECT 1 FROM inserted i WHERE i.email = s.email)
+ORDER BY s.line
+LIMIT :max_errors
+"""
+
+
+# Імпорт контактів користувача з CSV/JSONL:
+# файл читається і валідується частинами (IMPORT_CHUNK_ROWS) у потоці,
+# кожна частина йде в тимчасову таблицю через COPY (asyncpg),
+# потім один INSERT ... SELECT ... ON CONFLICT DO NOTHING в contacts.
+# Все в одній транзакції: пам'ять - одна частина, незалежно від розміру файлу.
+async def import_contacts(
+    file: BinaryIO, fmt: str, user_id: int, db: AsyncSession
+) -> dict:
+    report = ImportReport(settings.IMPORT_MAX_REPORTED_ERRORS)
+    records = iter_records(file, fmt)
+
+    def next_chunk() -> tuple[int, list[tuple], list[tuple[int, str]]]:
+        count, rows, errors = 0, [], []
+        for line, record in islice(records, settings.IMPORT_CHUNK_ROWS):
+            count += 1
+            row = record if isinstance(record, str) else _validate(line, record)
+            if isinstance(row, str):
+                errors.append((line, row))
+            else:
+                rows.append(row)
+        return count, rows, errors
+
+    conn = await db.connection()
+    raw = await conn.get_raw_connection()
+    pg = raw.driver_connection  # asyncpg.Connection (COPY)
+    await db.execute(text(_CREATE_STAGING))
+
+    while True:
+        count, rows, errors = await asyncio.to_thread(next_chunk)
+        if not count:
+            break
+        report.rows += count
+        report.invalid += len(errors)
+        for line, detail in errors:
+            report.error(line, detail)
+        if rows:
+            await pg.copy_records_to_table(STAGING_TABLE, records=rows, columns=COLUMNS)
+
+    await db.execute(text(f"CREATE INDEX ON {STAGING_TABLE} (email)"))
+    await db.execute(text(f"ANALYZE {STAGING_TABLE}"))
+    params = {"max_errors": report.max_errors}
+    duplicates = (await db.execute(text(_DROP_DUPLICATES), params)).all()
+    conflicts = (
+        await db.execute(text(_MERGE), {**params, "user_id": user_id})
+    ).all()
+    await db.commit()
+
+    for line, email, _ in duplicates:
+        report.error(line, "Duplicate email in file", email)
+    for line, email, _ in conflicts:
+        report.error(line, "Email already exists", email)
+    report.conflicts = sum(rows[0][2] for rows in (duplicates, conflicts) if rows)
+    report.imported = report.rows - report.invalid - report.conflicts
+    report.errors.sort(key=lambda e: e["line"])
+
+    if report.imported:
+        await contacts_changed(user_id)
+    logger.info(
+        f"Contacts import for user {user_id}: rows={report.rows} "
+        f"imported={report.imported} invalid={report.invalid} "
+        f"conflicts={report.conflicts}"
+    )
+    return report.as_dict()
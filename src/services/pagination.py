@@ -0,0 +1,46 @@
+import base64
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+# Непрозорий курсор для keyset-пагінації: base64url(JSON) з ключем сортування
+# і значеннями ключа останнього рядка сторінки
+def encode_cursor(sort: str, values: list[Any]) -> str:
+    raw = json.dumps({"s": sort, "k": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+INT4_MIN, INT4_MAX = -(2**31), 2**31 - 1
+
+
+# Значення JSON відповідає типу колонки (bool - не int; int годиться для float)
+def _matches(value: Any, expected: type) -> bool:
+    if isinstance(value, bool):
+        return False
+    if expected is float:
+        return isinstance(value, (int, float))
+    if expected is int:  # id - INTEGER (int4), інакше asyncpg падає з 500
+        return isinstance(value, int) and INT4_MIN <= value <= INT4_MAX
+    return isinstance(value, expected)
+
+
+# types - типи значень ключа сортування; курсор з іншими типами - 400, а не 500 з БД
+def decode_cursor(cursor: str, sort: str, types: tuple[type, ...]) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = data["k"]
+        if (
+            data["s"] != sort
+            or not isinstance(values, list)
+            or len(values) != len(types)
+            or not all(map(_matches, values, types))
+        ):
+            raise ValueError
+        return values
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        )
@@ -1,7 +1,6 @@
 from enum import Enum
 from fastapi import Depends, HTTPException, status
-from src.services.auth import auth_service
-from src.database.models import User
+from src.services.auth import auth_service, CurrentIdentity
 
 
 # Ролі користувачів
@@ -18,8 +17,8 @@ class RoleAccess:
         self.allowed = set(allowed)
 
     async def __call__(
-        self, current_user: User = Depends(auth_service.get_current_user)
-    ) -> User:
+        self, current_user: CurrentIdentity = Depends(auth_service.get_current_identity)
+    ) -> CurrentIdentity:
         if current_user.role not in self.allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden"
@@ -0,0 +1,170 @@
+import json
+import logging
+import time
+import uuid
+from typing import Any
+
+from src.conf.config import settings
+from src.services.cache import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+# Резерв задачі: спершу переносимо в ready ті, що дочекались backoff (delayed),
+# і ті, чий воркер помер (processing з простроченим дедлайном), потім беремо одну.
+# Прострочена задача - теж спроба: attempts + 1, після max_attempts - у dead.
+# attempts замінюється в рядку JSON: cjson.encode зробив би з порожнього списку {}.
+_RESERVE_LUA = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, raw in ipairs(due) do
+    redis.call('ZREM', KEYS[3], raw)
+    redis.call('LPUSH', KEYS[1], raw)
+end
+local stale = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1], 'LIMIT', 0, 100)
+for _, raw in ipairs(stale) do
+    redis.call('ZREM', KEYS[2], raw)
+    local attempts = cjson.decode(raw)['attempts'] + 1
+    local job = string.gsub(raw, '"attempts": %d+', '"attempts": ' .. attempts, 1)
+    redis.call('HINCRBY', KEYS[5], 'expired', 1)
+    if attempts >= tonumber(ARGV[3]) then
+        redis.call('LPUSH', KEYS[4], job)
+        redis.call('HINCRBY', KEYS[5], 'dead', 1)
+    else
+        redis.call('RPUSH', KEYS[1], job)
+    end
+end
+local raw = redis.call('RPOP', KEYS[1])
+if raw then
+    redis.call('ZADD', KEYS[2], ARGV[2], raw)
+end
+return raw
+"""
+
+
+# Надійна черга задач у Redis:
+#   ready (list) -> processing (zset, дедлайн видимості) -> ack
+#   помилка -> delayed (zset, експоненційний backoff) -> ... -> dead (list)
+class JobQueue:
+
+    def __init__(
+        self,
+        client,
+        name: str,
+        max_attempts: int = 5,
+        backoff_base: float = 2,
+        backoff_max: float = 300,
+        visibility_timeout: float = 300,
+    ):
+        self.client = client
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.visibility_timeout = visibility_timeout
+        prefix = f"queue:{name}"
+        self.ready_key = prefix
+        self.processing_key = f"{prefix}:processing"
+        self.delayed_key = f"{prefix}:delayed"
+        self.dead_key = f"{prefix}:dead"
+        self.stats_key = f"{prefix}:stats"
+        self._reserve = client.register_script(_RESERVE_LUA)
+
+    def _minute_key(self, minute: int) -> str:
+        return f"queue:{self.name}:processed:{minute}"
+
+    async def enqueue(self, task: str, *args: Any, **kwargs: Any) -> str:
+        job = {
+            "id": uuid.uuid4().hex,
+            "task": task,
+            "args": list(args),
+            "kwargs": kwargs,
+            "attempts": 0,
+            "enqueued_at": time.time(),
+        }
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.lpush(self.ready_key, json.dumps(job))
+            pipe.hincrby(self.stats_key, "enqueued", 1)
+            await pipe.execute()
+        return job["id"]
+
+    async def reserve(self) -> tuple[str, dict] | None:
+        now = time.time()
+        raw = await self._reserve(
+            keys=[
+                self.ready_key,
+                self.processing_key,
+                self.delayed_key,
+                self.dead_key,
+                self.stats_key,
+            ],
+            args=[now, now + self.visibility_timeout, self.max_attempts],
+        )
+        if raw is None:
+            return None
+        return raw, json.loads(raw)
+
+    async def ack(self, raw: str) -> None:
+        minute = int(time.time() // 60)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.processing_key, raw)
+            pipe.hincrby(self.stats_key, "processed", 1)
+            pipe.incr(self._minute_key(minute))
+            pipe.expire(self._minute_key(minute), 3600)
+            await pipe.execute()
+
+    async def fail(self, raw: str, job: dict, error: Exception) -> None:
+        if not await self.client.zrem(self.processing_key, raw):
+            return  # вже повернута в чергу іншим воркером після таймауту
+        job = {**job, "attempts": job["attempts"] + 1, "error": repr(error)}
+        async with self.client.pipeline(transaction=True) as pipe:
+            if job["attempts"] >= self.max_attempts:
+                logger.error(f"Job {job['id']} ({job['task']}) moved to dead letters")
+                pipe.lpush(self.dead_key, json.dumps(job))
+                pipe.hincrby(self.stats_key, "dead", 1)
+            else:
+                delay = min(self.backoff_max, self.backoff_base ** job["attempts"])
+                pipe.zadd(self.delayed_key, {json.dumps(job): time.time() + delay})
+                pipe.hincrby(self.stats_key, "retried", 1)
+            await pipe.execute()
+
+    async def stats(self) -> dict:
+        minute = int(time.time() // 60)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.llen(self.ready_key)
+            pipe.zcard(self.delayed_key)
+            pipe.zcard(self.processing_key)
+            pipe.llen(self.dead_key)
+            pipe.hgetall(self.stats_key)
+            pipe.get(self._minute_key(minute - 1))
+            ready, delayed, processing, dead, counters, last_minute = (
+                await pipe.execute()
+            )
+        return {
+            "depth": ready,
+            "delayed": delayed,
+            "processing": processing,
+            "dead": dead,
+            "processed_last_minute": int(last_minute or 0),
+            **{k: int(v) for k, v in counters.items()},
+        }
+
+
+email_queue = JobQueue(
+    redis_client,
+    "email",
+    max_attempts=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+    backoff_base=settings.EMAIL_QUEUE_BACKOFF_BASE,
+    backoff_max=settings.EMAIL_QUEUE_BACKOFF_MAX,
+    visibility_timeout=settings.EMAIL_QUEUE_VISIBILITY_TIMEOUT,
+)
+
+
+# Постановка листа в чергу; надсилає окремий процес worker.py
+async def enqueue_email(
+    email: str,
+    username: str,
+    link: str,
+    template_name: str = "email_template.html",
+) -> str:
+    return await email_queue.enqueue("send_email", email, username, link, template_name)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import logging
+from typing import Any
+
+import redis.asyncio as redis
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from src.conf.config import settings
+from src.services.serialization import json_response
+
+
+logger = logging.getLogger(__name__)
+
+# Заголовки, що зберігаються разом з тілом (ETag рахується заново з версії)
+STORED_HEADERS = ("x-next-cursor",)
+
+
+def dump_json(adapter: TypeAdapter, value: Any) -> bytes:
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+# Кеш готових JSON-відповідей у Redis.
+# Ключ містить версію контактів користувача (contacts_changed збільшує її при
+# кожному записі): інвалідація - O(1), старі ключі просто доживають TTL.
+# Значення - байти: службовий JSON із заголовками, "\n", тіло відповіді.
+class ResponseCache:
+
+    def __init__(self, client: redis.Redis, ttls: dict[str, int]):
+        self.client = client
+        self.ttls = ttls
+        self.counters = {route: {"hits": 0, "misses": 0} for route in ttls}
+
+    def key(self, route: str, user_id: int, version: int | None, *parts) -> str | None:
+        # None: кеш маршруту вимкнено (TTL 0) або версія невідома (Redis недоступний)
+        if not self.ttls.get(route) or version is None:
+            return None
+        params = hashlib.sha256(
+            json.dumps(parts, default=str).encode()
+        ).hexdigest()[:32]
+        return f"resp:{route}:{user_id}:{version}:{params}"
+
+    async def get(self, route: str, key: str | None, response: Response):
+        if key is None:
+            return None
+        try:
+            value = await self.client.get(key)
+        except redis.RedisError as err:
+            logger.warning(f"Response cache get failed ({route}): {err}")
+            return None
+        if value is None:
+            self.counters[route]["misses"] += 1
+            return None
+        self.counters[route]["hits"] += 1
+        meta, body = value.split(b"\n", 1)
+        response.headers.update(json.loads(meta))
+        return json_response(body, response)
+
+    # Зберігає вже серіалізоване тіло і повертає готову відповідь
+    async def store(
+        self, route: str, key: str, body: bytes, response: Response
+    ) -> Response:
+        stored = {
+            k: v for k, v in response.headers.items() if k.lower() in STORED_HEADERS
+        }
+        try:
+            await self.client.set(
+                key, json.dumps(stored).encode() + b"\n" + body, ex=self.ttls[route]
+            )
+        except redis.RedisError as err:
+            logger.warning(f"Response cache set failed ({route}): {err}")
+        return json_response(body, response)
+
+    def stats(self) -> dict:
+        result = {}
+        for route, c in self.counters.items():
+            total = c["hits"] + c["misses"]
+            result[route] = {
+                **c,
+                "ttl": self.ttls[route],
+                "hit_rate": round(c["hits"] / total, 3) if total else None,
+            }
+        return result
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+response_cache = ResponseCache(
+    # окремий клієнт без decode_responses: значення - байти
+    redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT),
+    ttls={
+        "list": settings.RESPONSE_CACHE_TTL_LIST,
+        "contact": settings.RESPONSE_CACHE_TTL_CONTACT,
+        "search": settings.RESPONSE_CACHE_TTL_SEARCH,
+        "birthdays": settings.RESPONSE_CACHE_TTL_BIRTHDAYS,
+    },
+)
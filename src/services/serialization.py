@@ -0,0 +1,32 @@
+from typing import Iterable, Sequence
+
+import orjson
+from fastapi import Response
+
+from src.schemas import ContactResponse
+
+
+# Порядок ключів як у ContactResponse - відповідь побайтово та сама, що й через Pydantic
+CONTACT_RESPONSE_FIELDS = tuple(ContactResponse.model_fields)
+
+# Заголовки, які переносяться з injected Response у готову відповідь
+PASSTHROUGH_HEADERS = ("etag", "cache-control", "x-next-cursor")
+
+
+# Компактний UTF-8 JSON, date - ISO 8601 (так само, як у Pydantic)
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj)
+
+
+# Швидкий шлях (FAST_JSON): рядки-кортежі у порядку CONTACT_RESPONSE_FIELDS
+# серіалізуються напряму, без ORM-об'єктів і валідації Pydantic
+def contact_rows_json(rows: Iterable[Sequence]) -> bytes:
+    return dumps([dict(zip(CONTACT_RESPONSE_FIELDS, row)) for row in rows])
+
+
+# Готова JSON-відповідь з уже серіалізованого тіла + заголовки маршруту
+def json_response(body: bytes, response: Response) -> Response:
+    headers = {
+        k: v for k, v in response.headers.items() if k.lower() in PASSTHROUGH_HEADERS
+    }
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,95 @@
+import logging
+import uuid
+
+from src.conf.config import settings
+from src.services.cache import redis_client
+
+
+logger = logging.getLogger(__name__)
+
+
+# Створення сесії + прибирання з індексу сесій, що вже протухли
+_CREATE_LUA = """
+for _, jti in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    if redis.call('EXISTS', ARGV[3] .. jti) == 0 then
+        redis.call('SREM', KEYS[2], jti)
+    end
+end
+redis.call('SET', KEYS[1], '1', 'EX', ARGV[2])
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+"""
+
+# Ротація: стара сесія видаляється і нова створюється лише якщо стара ще існує
+_ROTATE_LUA = """
+if redis.call('DEL', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('SREM', KEYS[3], ARGV[1])
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+redis.call('SADD', KEYS[3], ARGV[2])
+redis.call('EXPIRE', KEYS[3], ARGV[3])
+return 1
+"""
+
+_REVOKE_ALL_LUA = """
+for _, jti in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    redis.call('DEL', ARGV[1] .. jti)
+end
+return redis.call('DEL', KEYS[1])
+"""
+
+
+# Сховище refresh-сесій у Redis: одна сесія = один пристрій (jti у refresh-токені).
+# Всі операції атомарні (Lua), TTL = REFRESH_EXPIRE_DAYS.
+class SessionStore:
+
+    def __init__(self, client, ttl_seconds: int):
+        self.client = client
+        self.ttl = ttl_seconds
+        self._create = client.register_script(_CREATE_LUA)
+        self._rotate = client.register_script(_ROTATE_LUA)
+        self._revoke_all = client.register_script(_REVOKE_ALL_LUA)
+
+    @staticmethod
+    def _prefix(email: str) -> str:
+        return f"session:{email}:"
+
+    @staticmethod
+    def _index(email: str) -> str:
+        return f"sessions:{email}"
+
+    async def create(self, email: str) -> str:
+        jti = uuid.uuid4().hex
+        prefix = self._prefix(email)
+        await self._create(
+            keys=[prefix + jti, self._index(email)], args=[jti, self.ttl, prefix]
+        )
+        return jti
+
+    async def rotate(self, email: str, jti: str) -> str | None:
+        new_jti = uuid.uuid4().hex
+        prefix = self._prefix(email)
+        ok = await self._rotate(
+            keys=[prefix + jti, prefix + new_jti, self._index(email)],
+            args=[jti, new_jti, self.ttl],
+        )
+        return new_jti if ok else None
+
+    async def revoke(self, email: str, jti: str) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(self._prefix(email) + jti)
+            pipe.srem(self._index(email), jti)
+            await pipe.execute()
+
+    async def revoke_all(self, email: str) -> None:
+        await self._revoke_all(keys=[self._index(email)], args=[self._prefix(email)])
+
+    async def count(self, email: str) -> int:
+        return await self.client.scard(self._index(email))
+
+
+session_store = SessionStore(
+    redis_client, ttl_seconds=settings.REFRESH_EXPIRE_DAYS * 24 * 60 * 60
+)
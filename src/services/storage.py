@@ -1,14 +1,85 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
 import cloudinary, cloudinary.uploader
 from src.conf.config import settings
 
-cloudinary.config(
-    cloud_name=settings.CLOUDINARY_NAME,
-    api_key=settings.CLOUDINARY_API_KEY,
-    api_secret=settings.CLOUDINARY_API_SECRET,
-    secure=True,
-)
-
-async def upload_avatar(fileobj, public_id: str):
-    # fileobj = SpooledTemporaryFile из UploadFile.file
-    res = cloudinary.uploader.upload(fileobj, public_id=public_id, folder="avatars", overwrite=True)
-    return res["secure_url"]
+
+# Бекенд зберігання аватарів: приймає готові байти, повертає URL
+class AvatarStorage(ABC):
+
+    @abstractmethod
+    async def save(self, data: bytes, name: str) -> str:
+        ...
+
+    # Чи є ще файл за URL, збереженим раніше (дедуплікація в process_avatar)
+    async def exists(self, url: str) -> bool:
+        return True
+
+
+# Cloudinary (production): конфігурується один раз, upload - у потоці
+class CloudinaryStorage(AvatarStorage):
+
+    def __init__(self, cloud_name: str, api_key: str, api_secret: str):
+        cloudinary.config(
+            cloud_name=cloud_name,
+            api_key=api_key,
+            api_secret=api_secret,
+            secure=True,
+        )
+
+    async def save(self, data: bytes, name: str) -> str:
+        public_id = f"ContactsAPI/{name}"
+        res = await asyncio.to_thread(
+            cloudinary.uploader.upload, data, public_id=public_id, overwrite=True
+        )
+        return cloudinary.CloudinaryImage(public_id).build_url(
+            width=250, height=250, crop="fill", version=res.get("version")
+        )
+
+
+# Локальна файлова система (розробка, тести, air-gapped).
+# Content-addressed: ім'я файлу = sha256 вмісту, шардування ab/cd/<sha256>.jpg.
+# Файл з таким іменем ніколи не змінюється - його можна кешувати назавжди.
+class FileSystemStorage(AvatarStorage):
+
+    def __init__(self, root: Path, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest[2:4] / f"{digest}.jpg"
+
+    def _write(self, path: Path, data: bytes) -> None:
+        if path.exists():
+            return  # той самий вміст уже збережено
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # атомарно: читачі не побачать недописаний файл
+
+    async def save(self, data: bytes, name: str) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self._write, self.path_for(digest), data)
+        return f"{self.base_url}/{digest}.jpg"
+
+    async def exists(self, url: str) -> bool:
+        digest = url.rsplit("/", 1)[-1].removesuffix(".jpg")
+        return await asyncio.to_thread(self.path_for(digest).exists)
+
+
+def get_avatar_storage() -> AvatarStorage:
+    if settings.AVATAR_STORAGE == "local":
+        return FileSystemStorage(Path(settings.AVATAR_LOCAL_DIR), "/api/avatars")
+    return CloudinaryStorage(
+        settings.CLOUDINARY_NAME,
+        settings.CLOUDINARY_API_KEY,
+        settings.CLOUDINARY_API_SECRET,
+    )
+
+
+avatar_storage = get_avatar_storage()
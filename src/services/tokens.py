@@ -0,0 +1,95 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List
+
+
+# Єдині помилки для всіх бекендів
+class TokenError(Exception):
+    pass
+
+
+class TokenExpiredError(TokenError):
+    pass
+
+
+# Кодек JWT: один інтерфейс для кодування/перевірки токенів незалежно від бібліотеки
+class TokenCodec(ABC):
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, payload: Dict[str, Any], key: str, algorithm: str) -> str:
+        ...
+
+    @abstractmethod
+    def decode(self, token: str, key: str, algorithms: List[str]) -> Dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def get_unverified_header(self, token: str) -> Dict[str, Any]:
+        ...
+
+
+class JoseCodec(TokenCodec):
+    name = "jose"
+
+    def __init__(self):
+        from jose import jwt, JWTError, ExpiredSignatureError
+
+        self._jwt = jwt
+        self._error = JWTError
+        self._expired = ExpiredSignatureError
+
+    def encode(self, payload, key, algorithm):
+        return self._jwt.encode(payload, key, algorithm=algorithm)
+
+    def decode(self, token, key, algorithms):
+        try:
+            return self._jwt.decode(token, key, algorithms=algorithms)
+        except self._expired as err:
+            raise TokenExpiredError(str(err)) from err
+        except self._error as err:
+            raise TokenError(str(err)) from err
+
+    def get_unverified_header(self, token):
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._error as err:
+            raise TokenError(str(err)) from err
+
+
+class PyJWTCodec(TokenCodec):
+    name = "pyjwt"
+
+    def __init__(self):
+        import jwt
+
+        self._jwt = jwt
+
+    def encode(self, payload, key, algorithm):
+        return self._jwt.encode(payload, key, algorithm=algorithm)
+
+    def decode(self, token, key, algorithms):
+        try:
+            return self._jwt.decode(token, key, algorithms=algorithms)
+        except self._jwt.ExpiredSignatureError as err:
+            raise TokenExpiredError(str(err)) from err
+        except self._jwt.PyJWTError as err:
+            raise TokenError(str(err)) from err
+
+    def get_unverified_header(self, token):
+        try:
+            return self._jwt.get_unverified_header(token)
+        except self._jwt.PyJWTError as err:
+            raise TokenError(str(err)) from err
+
+
+BACKENDS = {
+    JoseCodec.name: JoseCodec,
+    PyJWTCodec.name: PyJWTCodec,
+}
+
+
+def get_codec(name: str) -> TokenCodec:
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JWT backend: {name}")
@@ -0,0 +1,132 @@
+import os
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.pool import NullPool
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# Обов'язкові змінні Settings - до першого імпорту src (реальний .env не потрібен)
+TEST_ENV = {
+    "SECRET_KEY": "test-secret",
+    "ADMIN_EMAIL": "admin@example.com",
+    "ADMIN_PASSWORD": "Password",
+    "MAIL_USERNAME": "test",
+    "MAIL_PASSWORD": "test",
+    "MAIL_FROM": "noreply@example.com",
+    "MAIL_SERVER": "127.0.0.1",
+    "CLOUDINARY_NAME": "test",
+    "CLOUDINARY_API_KEY": "test",
+    "CLOUDINARY_API_SECRET": "test",
+    "PGADMIN_DEFAULT_EMAIL": "admin@example.com",
+    "PGADMIN_DEFAULT_PASSWORD": "test",
+    "DEBUG_EMAILS": "False",
+    # рушій створюється при імпорті, з'єднання - лише в тестах з БД
+    "DATABASE_URL": "postgresql+asyncpg://postgres@localhost/contacts_test",
+}
+for name, value in TEST_ENV.items():
+    os.environ.setdefault(name, value)
+
+# Тести з БД (bulk, імпорт) - лише з окремою тестовою базою: таблиці
+# перестворюються для кожного тесту, інакше такі тести пропускаються
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+
+
+# Redis у пам'яті замість redis_client (і Lua-скриптів, зареєстрованих на ньому)
+@pytest.fixture
+async def fake_redis(monkeypatch):
+    from src.services import cache, digest
+
+    client = FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "redis_client", client)
+    monkeypatch.setattr(digest, "redis_client", client)
+    for name, script in (
+        ("_get_version", cache._GET_VERSION_LUA),
+        ("_bump_version", cache._BUMP_VERSION_LUA),
+        ("_set_if_version", cache._SET_IF_VERSION_LUA),
+    ):
+        monkeypatch.setattr(cache, name, client.register_script(script))
+    cache.local_token_versions.clear()
+    cache.local_users.clear()
+    yield client
+    cache.local_token_versions.clear()
+    cache.local_users.clear()
+    await client.aclose()
+
+
+def _create_schema(conn) -> None:
+    from src.database.models import Base
+
+    Base.metadata.drop_all(conn)
+    trgm = conn.exec_driver_sql(
+        "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+    ).scalar()
+    if trgm:
+        conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        Base.metadata.create_all(conn)
+        return
+    # без pg_trgm (мінімальні збірки Postgres) - все, крім GIN-індексів пошуку
+    for table in Base.metadata.sorted_tables:
+        conn.execute(CreateTable(table))
+        for index in table.indexes:
+            ops = index.dialect_options["postgresql"]["ops"]
+            if "gin_trgm_ops" not in ops.values():
+                index.create(conn)
+
+
+@pytest.fixture
+async def db(fake_redis):
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(TEST_DATABASE_URL, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_schema)
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    async with engine.begin() as conn:
+        await conn.run_sync(_drop_schema)
+    await engine.dispose()
+
+
+def _drop_schema(conn) -> None:
+    from src.database.models import Base
+
+    Base.metadata.drop_all(conn)
+
+
+@pytest.fixture
+async def user(db):
+    from src.database.models import User
+
+    user = User(username="owner", email="owner@example.com", password="x", role="user")
+    db.add(user)
+    await db.commit()
+    return user
+
+
+# Клієнт до роутера контактів: поточний користувач і сесія БД підставлені,
+# ліміти запитів (fastapi-limiter) - на fake Redis
+@pytest.fixture
+async def client(db, user, fake_redis):
+    from fastapi import FastAPI
+    from fastapi_limiter import FastAPILimiter
+
+    from src.database.db import get_db
+    from src.routes import contacts
+    from src.schemas import TokenIdentity
+    from src.services.auth import auth_service
+
+    app = FastAPI()
+    app.include_router(contacts.router, prefix="/api")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[auth_service.get_current_identity] = lambda: (
+        TokenIdentity(id=user.id, email=user.email, role=user.role)
+    )
+    await FastAPILimiter.init(fake_redis)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
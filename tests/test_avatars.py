@@ -0,0 +1,93 @@
+import io
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from src.conf.config import settings
+from src.services import avatars
+from src.services.avatars import process_avatar, resize_avatar
+from src.services.storage import AvatarStorage, FileSystemStorage
+
+
+def _png(size=(400, 300)) -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", size, "red").save(out, format="PNG")
+    return out.getvalue()
+
+
+def _upload(data: bytes, content_type: str = "image/png") -> UploadFile:
+    return UploadFile(
+        io.BytesIO(data),
+        filename="avatar.png",
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = FileSystemStorage(tmp_path, "/api/avatars")
+    monkeypatch.setattr(settings, "AVATAR_STORAGE", "local")
+    monkeypatch.setattr(avatars, "avatar_storage", storage)
+    monkeypatch.setattr(avatars, "redis_client", FakeAsyncRedis(decode_responses=True))
+    return storage
+
+
+def test_resize_avatar_to_jpeg():
+    with Image.open(io.BytesIO(resize_avatar(_png()))) as img:
+        assert img.format == "JPEG"
+        assert img.size == avatars.AVATAR_SIZE
+
+
+@pytest.mark.parametrize("data", [b"not an image", _png()[:100]])
+def test_resize_avatar_rejects_undecodable(data):
+    with pytest.raises(HTTPException) as exc:
+        resize_avatar(data)
+    assert exc.value.status_code == 400
+
+
+async def test_process_avatar_stores_resized(storage):
+    url = await process_avatar(_upload(_png()))
+
+    digest = url.rsplit("/", 1)[-1].removesuffix(".jpg")
+    with Image.open(storage.path_for(digest)) as img:
+        assert img.size == avatars.AVATAR_SIZE
+    assert await process_avatar(_upload(_png())) == url  # дедуплікація
+
+
+async def test_process_avatar_dedup_key_per_storage(storage):
+    url = await process_avatar(_upload(_png()))
+
+    keys = await avatars.redis_client.keys("avatar:*")
+    assert len(keys) == 1 and keys[0].startswith("avatar:local:")
+    assert await avatars.redis_client.get(keys[0]) == url
+
+
+async def test_process_avatar_restores_missing_file(storage):
+    url = await process_avatar(_upload(_png()))
+    path = storage.path_for(url.rsplit("/", 1)[-1].removesuffix(".jpg"))
+    path.unlink()  # файл видалено, ключ дедуплікації в Redis лишився
+
+    assert await process_avatar(_upload(_png())) == url
+    assert path.exists()
+
+
+async def test_process_avatar_rejects_undecodable(storage, tmp_path):
+    with pytest.raises(HTTPException) as exc:
+        await process_avatar(_upload(b"\x89PNG\r\n\x1a\n garbage"))
+
+    assert exc.value.status_code == 400
+    assert not any(tmp_path.rglob("*.jpg"))
+
+
+async def test_process_avatar_rejects_media_type(storage):
+    with pytest.raises(HTTPException) as exc:
+        await process_avatar(_upload(_png(), "text/plain"))
+    assert exc.value.status_code == 415
+
+
+def test_avatar_storage_is_abstract():
+    with pytest.raises(TypeError):
+        AvatarStorage()
@@ -0,0 +1,141 @@
+import pytest
+
+from src.conf.config import settings
+
+
+def _contact(n: int, **fields) -> dict:
+    return {
+        "first_name": f"Name{n}",
+        "last_name": "Last",
+        "email": f"contact{n}@example.com",
+        "phone": "+380501234567",
+        "birthday": "1990-05-17",
+        **fields,
+    }
+
+
+async def _create(client, *items) -> list[dict]:
+    res = await client.post("/api/contacts/bulk", json=list(items))
+    assert res.status_code == 200
+    return res.json()["results"]
+
+
+async def test_bulk_create_reports_conflicts_per_item(client):
+    await _create(client, _contact(1))
+
+    res = await client.post(
+        "/api/contacts/bulk",
+        json=[_contact(2), _contact(1), _contact(3), _contact(2, first_name="Dup")],
+    )
+
+    assert res.status_code == 200
+    body = res.json()
+    assert (body["succeeded"], body["failed"]) == (2, 2)
+    assert [(r["index"], r["status"], r["detail"]) for r in body["results"]] == [
+        (0, "created", None),
+        (1, "conflict", "Email already exists"),
+        (2, "created", None),
+        (3, "conflict", "Duplicate email in request"),
+    ]
+    assert body["results"][0]["contact"]["email"] == "contact2@example.com"
+    assert body["results"][1]["contact"] is None
+
+
+async def test_bulk_update_reports_conflict_and_not_found(client):
+    first, second = await _create(client, _contact(1), _contact(2))
+
+    res = await client.put(
+        "/api/contacts/bulk",
+        json=[
+            {**_contact(1, first_name="Renamed"), "id": first["id"]},
+            {**_contact(1), "id": second["id"]},  # email першого контакту
+            {**_contact(9), "id": 999999},
+        ],
+    )
+
+    assert res.status_code == 200
+    results = res.json()["results"]
+    assert [(r["status"], r["id"]) for r in results] == [
+        ("updated", first["id"]),
+        ("conflict", second["id"]),
+        ("not_found", 999999),
+    ]
+    assert results[0]["contact"]["first_name"] == "Renamed"
+    assert results[1]["detail"] == "Email already exists"
+    assert results[2]["detail"] == "Contact not found"
+
+
+async def test_bulk_rejects_too_long_fields(client):
+    res = await client.post(
+        "/api/contacts/bulk",
+        json=[_contact(1, first_name="N" * 26), _contact(2)],
+    )
+
+    body = res.json()
+    assert [(r["status"], r["detail"]) for r in body["results"]] == [
+        ("invalid", "first_name: longer than 25 characters"),
+        ("created", None),
+    ]
+    (created,) = [r for r in body["results"] if r["status"] == "created"]
+
+    res = await client.put(
+        "/api/contacts/bulk",
+        json=[{**_contact(2, phone="1" * 21), "id": created["id"]}],
+    )
+
+    assert res.status_code == 200
+    (result,) = res.json()["results"]
+    assert (result["status"], result["detail"]) == (
+        "invalid",
+        "phone: longer than 20 characters",
+    )
+
+
+async def test_bulk_update_not_found_does_not_claim_email(client):
+    (created,) = await _create(client, _contact(1))
+
+    res = await client.put(
+        "/api/contacts/bulk",
+        json=[
+            {**_contact(5), "id": 999999},
+            {**_contact(5), "id": created["id"]},
+        ],
+    )
+
+    assert [(r["status"], r["id"]) for r in res.json()["results"]] == [
+        ("not_found", 999999),
+        ("updated", created["id"]),
+    ]
+
+
+async def test_bulk_delete_reports_not_found(client):
+    (created,) = await _create(client, _contact(1))
+
+    res = await client.request(
+        "DELETE", "/api/contacts/bulk", json={"ids": [created["id"], 999999]}
+    )
+
+    assert res.status_code == 200
+    body = res.json()
+    assert [(r["status"], r["id"]) for r in body["results"]] == [
+        ("deleted", created["id"]),
+        ("not_found", 999999),
+    ]
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+
+
+@pytest.mark.parametrize(
+    "method, body",
+    [
+        ("POST", lambda n: [_contact(i) for i in range(n)]),
+        ("PUT", lambda n: [{**_contact(i), "id": i + 1} for i in range(n)]),
+        ("DELETE", lambda n: {"ids": list(range(1, n + 1))}),
+    ],
+)
+async def test_bulk_max_items(client, monkeypatch, method, body):
+    monkeypatch.setattr(settings, "BULK_MAX_ITEMS", 3)
+
+    res = await client.request(method, "/api/contacts/bulk", json=body(4))
+
+    assert res.status_code == 413
+    assert res.json()["detail"] == "Too many items, max 3 per request"
@@ -0,0 +1,78 @@
+import redis.asyncio as redis
+
+from src.database.models import User
+from src.services import cache
+from src.services.cache import (
+    bump_token_version,
+    cache_user,
+    contacts_changed,
+    get_cached_user,
+    get_contacts_version,
+    get_token_version,
+    get_user_version,
+    invalidate_user,
+)
+
+EMAIL = "user@example.com"
+
+
+class FailingScript:
+
+    async def __call__(self, keys=None, args=None, client=None):
+        raise redis.ResponseError("BUSY Redis is busy running a script")
+
+
+async def test_contacts_changed_bumps_version(fake_redis):
+    version = await get_contacts_version(1)
+
+    await contacts_changed(1)
+
+    assert await get_contacts_version(1) > version
+
+
+async def test_failed_bump_drops_version(fake_redis, monkeypatch):
+    version = await get_contacts_version(1)
+    await fake_redis.set("birthdays:1", "{}")
+    monkeypatch.setattr(cache, "_bump_version", FailingScript())
+
+    await contacts_changed(1)
+
+    assert await fake_redis.get("contacts:ver:1") is None
+    assert await fake_redis.get("birthdays:1") is None
+    assert await get_contacts_version(1) > version  # засіяна заново з часу Redis
+
+
+async def test_failed_token_bump_drops_version(fake_redis, monkeypatch):
+    version = await get_token_version(1)
+    monkeypatch.setattr(cache, "_bump_version", FailingScript())
+
+    await bump_token_version(1)
+
+    assert await fake_redis.get("user:tv:1") is None
+    assert await get_token_version(1) > version  # старі токени недійсні
+
+
+def _user(role: str = "user") -> User:
+    return User(id=1, username="user", email=EMAIL, role=role, confirmed=True)
+
+
+async def test_cache_user_round_trip(fake_redis):
+    await cache_user(_user(), await get_user_version(EMAIL))
+    cache.local_users.clear()
+
+    cached = await get_cached_user(EMAIL)
+
+    assert (cached.id, cached.role) == (1, "user")
+
+
+async def test_cache_user_skips_row_read_before_invalidate(fake_redis):
+    version = await get_user_version(EMAIL)  # читач: версія, потім БД
+    stale = _user()
+    await invalidate_user(EMAIL)  # запис закомічено, поки читач читав БД
+
+    await cache_user(stale, version)
+
+    assert await fake_redis.get(f"user:{EMAIL}") is None
+    assert await get_cached_user(EMAIL) is None
+    await cache_user(_user("admin"), await get_user_version(EMAIL))
+    assert (await get_cached_user(EMAIL)).role == "admin"
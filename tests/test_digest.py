@@ -0,0 +1,197 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+
+import pytest
+
+from src.database.models import Contact
+from src.schemas import TokenIdentity
+from src.services import digest
+from src.services.cache import (
+    contacts_changed,
+    get_birthday_digest,
+    get_contacts_version,
+    get_digest_versions,
+    redis_time_us,
+)
+
+USER = TokenIdentity(id=1, email="user@example.com", role="user")
+
+
+def _contact(contact_id: int, birthday: date) -> Contact:
+    return Contact(
+        id=contact_id,
+        first_name=f"Name{contact_id}",
+        last_name="Last",
+        email=f"contact{contact_id}@example.com",
+        phone="+380501234567",
+        birthday=birthday,
+        user_id=USER.id,
+    )
+
+
+class FakeRepo:
+    """get_upcoming_birthdays без БД; during_query - «паралельний» запис"""
+
+    def __init__(self):
+        self.calls = 0
+        self.during_query = None
+
+    async def get_upcoming_birthdays(self, days, user, db, today=None):
+        self.calls += 1
+        contacts = [_contact(self.calls, date.today() + timedelta(days=1))]
+        if self.during_query is not None:
+            await self.during_query()
+            self.during_query = None
+        return contacts
+
+
+@pytest.fixture
+def repo(monkeypatch, fake_redis):
+    repo = FakeRepo()
+    monkeypatch.setattr(
+        digest.repo_contacts, "get_upcoming_birthdays", repo.get_upcoming_birthdays
+    )
+    return repo
+
+
+async def _upcoming(days: int = 7) -> list[dict]:
+    version = await get_contacts_version(USER.id)
+    return await digest.upcoming_birthdays(days, USER, None, version)
+
+
+async def test_digest_served_from_redis(repo):
+    first = await _upcoming()
+    second = await _upcoming()
+
+    assert first == second
+    assert repo.calls == 1
+
+
+async def test_contacts_change_drops_digest(repo):
+    await _upcoming()
+    await contacts_changed(USER.id)
+
+    entries = await _upcoming()
+
+    assert repo.calls == 2
+    assert entries[0]["id"] == 2
+
+
+async def test_digest_built_during_write_is_not_served(repo):
+    # запис закомічено і версію збільшено, поки читач ще будував дайджест
+    repo.during_query = lambda: contacts_changed(USER.id)
+    await _upcoming()
+
+    entries = await _upcoming()
+
+    assert repo.calls == 2
+    assert entries[0]["id"] == 2
+    await _upcoming()
+    assert repo.calls == 2  # дайджест з актуальною версією - влучання
+
+
+async def test_versions_are_time_based(fake_redis):
+    version = await get_contacts_version(USER.id)
+    before_bump = await redis_time_us()
+
+    await contacts_changed(USER.id)
+
+    bumped = await get_contacts_version(USER.id)
+    assert bumped > version and bumped >= before_bump
+
+
+async def test_digest_versions_skip_users_changed_after_start(fake_redis):
+    unchanged = await get_contacts_version(1)
+    started = await redis_time_us()
+    await contacts_changed(3)  # змінився, поки йшов запит дайджесту
+
+    versions = await get_digest_versions([1, 2, 3], started)
+
+    assert versions == {1: unchanged, 2: started - 1}
+    assert await get_contacts_version(2) == started - 1
+
+
+class FakeDigestSession:
+    """db.stream(...) для run_digest без БД: рядки (user_id, email, username,
+    confirmed, contact) у порядку user_id; on_stream - «паралельний» запис"""
+
+    def __init__(self, rows: list[tuple], on_stream=None):
+        self.rows = rows
+        self.on_stream = on_stream
+
+    async def stream(self, stmt):
+        if self.on_stream is not None:
+            await self.on_stream()
+        return self._iterate()
+
+    async def _iterate(self):
+        for row in self.rows:
+            yield row
+
+    def expunge_all(self):
+        pass
+
+
+@pytest.fixture
+def digest_run(monkeypatch, fake_redis):
+    tomorrow = date.today() + timedelta(days=1)
+    fake = FakeDigestSession(
+        [
+            (1, "one@example.com", "one", True, _contact(1, tomorrow)),
+            (1, "one@example.com", "one", True, _contact(2, tomorrow)),
+            (2, "two@example.com", "two", False, _contact(3, tomorrow)),
+            (3, "three@example.com", "three", True, None),
+        ]
+    )
+    sent = []
+
+    @asynccontextmanager
+    async def session():
+        yield fake
+
+    async def send_emails(items):
+        sent.extend(items)
+        return [None] * len(items)
+
+    monkeypatch.setattr(digest, "session", session)
+    monkeypatch.setattr(digest, "send_emails", send_emails)
+    return fake, sent
+
+
+async def test_run_digest_stores_digests_and_sends_emails(digest_run, fake_redis):
+    _, sent = digest_run
+    today = date.today()
+
+    stats = await digest.run_digest(today)
+
+    assert {k: v for k, v in stats.items() if k != "seconds"} == {
+        "users": 3,
+        "skipped": 0,
+        "contacts": 3,
+        "emails": 1,
+        "email_errors": 0,
+    }
+    assert isinstance(stats["seconds"], float)
+    # лист - лише підтвердженому користувачу з найближчими ДР
+    assert [item[0] for item in sent] == ["one@example.com"]
+    entries = await get_birthday_digest(1, today, await get_contacts_version(1))
+    assert [e["id"] for e in entries] == [1, 2]
+    assert await get_birthday_digest(3, today, await get_contacts_version(3)) == []
+    # блокування дня лишається: повторний запуск нічого не надсилає
+    assert await fake_redis.exists(f"birthdays:run:{today.isoformat()}")
+    assert await digest.run_digest(today) is None
+    assert len(sent) == 1
+
+
+async def test_run_digest_skips_users_changed_during_run(digest_run, fake_redis):
+    fake, _ = digest_run
+    fake.on_stream = lambda: contacts_changed(1)
+    today = date.today()
+
+    stats = await digest.run_digest(today)
+
+    assert stats["skipped"] == 1
+    assert await fake_redis.get("birthdays:1") is None
+    data = json.loads(await fake_redis.get("birthdays:2"))
+    assert data["version"] == await get_contacts_version(2)
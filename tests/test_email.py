@@ -0,0 +1,153 @@
+import asyncio
+import socket
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from src.services import email as email_service
+from src.services.email import SMTPMailer
+
+
+# SMTP-сервер у тому ж процесі: запам'ятовує листи і з'єднання, з яких вони прийшли
+class RecordingHandler:
+
+    def __init__(self):
+        self.messages: list[tuple[int, str, list[str]]] = []
+        self.transports = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("reject"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if server.transport not in self.transports:
+            self.transports.append(server.transport)
+        self.messages.append((id(session), envelope.mail_from, envelope.rcpt_tos))
+        return "250 Message accepted"
+
+    @property
+    def sessions(self) -> int:
+        return len({session for session, _, _ in self.messages})
+
+
+class SMTPServer:
+
+    def __init__(self, handler: RecordingHandler, controller: Controller):
+        self.handler = handler
+        self.controller = controller
+
+    # Сервер розриває всі відкриті з'єднання (як після idle-таймауту)
+    async def drop_connections(self) -> None:
+        for transport in self.handler.transports:
+            self.controller.loop.call_soon_threadsafe(transport.close)
+        self.handler.transports.clear()
+        await asyncio.sleep(0.2)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    yield SMTPServer(handler, controller)
+    controller.stop()
+
+
+@pytest.fixture
+async def mailer(smtp_server):
+    mailer = SMTPMailer(
+        hostname=smtp_server.controller.hostname,
+        port=smtp_server.controller.port,
+        username=None,
+        password=None,
+        start_tls=False,
+        pool_size=1,
+        timeout=5,
+    )
+    yield mailer
+    await mailer.close()
+
+
+def _message(to: str = "user@example.com") -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = "noreply@example.com"
+    message["To"] = to
+    message["Subject"] = "Test"
+    message.set_content("Hello")
+    return message
+
+
+async def test_connection_reused_across_messages(smtp_server, mailer):
+    for i in range(3):
+        await mailer.send(_message(f"user{i}@example.com"))
+
+    assert mailer.stats() == {"pool_size": 1, "sent": 3, "failed": 0, "connects": 1}
+    assert len(smtp_server.handler.messages) == 3
+    assert smtp_server.handler.sessions == 1
+
+
+async def test_new_session_after_max_per_session(smtp_server, mailer):
+    mailer.max_per_session = 2
+
+    for i in range(5):
+        await mailer.send(_message(f"user{i}@example.com"))
+
+    assert mailer.sent == 5
+    assert mailer.connects == 3
+    assert smtp_server.handler.sessions == 3
+
+
+async def test_reconnect_after_server_drops_connection(smtp_server, mailer):
+    await mailer.send(_message("first@example.com"))
+    await smtp_server.drop_connections()
+
+    await mailer.send(_message("second@example.com"))
+
+    assert mailer.stats() == {"pool_size": 1, "sent": 2, "failed": 0, "connects": 2}
+    assert [rcpt for _, _, rcpt in smtp_server.handler.messages] == [
+        ["first@example.com"],
+        ["second@example.com"],
+    ]
+    assert smtp_server.handler.sessions == 2
+
+
+async def test_send_batch_reports_error_per_message(smtp_server, mailer):
+    messages = [
+        _message("a@example.com"),
+        _message("reject@example.com"),
+        _message("b@example.com"),
+    ]
+
+    results = await mailer.send_batch(messages)
+
+    assert results[0] is None and results[2] is None
+    assert results[1] is not None
+    assert mailer.sent == 2 and mailer.failed == 1
+    assert mailer.connects == 1
+    assert [rcpt for _, _, rcpt in smtp_server.handler.messages] == [
+        ["a@example.com"],
+        ["b@example.com"],
+    ]
+
+
+async def test_send_emails_uses_one_session(smtp_server, mailer, monkeypatch):
+    monkeypatch.setattr(email_service, "mailer", mailer)
+    items = [
+        (f"user{i}@example.com", f"user{i}", f"http://test/{i}", "email_template.html")
+        for i in range(4)
+    ]
+
+    results = await email_service.send_emails(items)
+
+    assert results == [None] * 4
+    assert mailer.connects == 1
+    assert smtp_server.handler.sessions == 1
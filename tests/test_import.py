@@ -0,0 +1,108 @@
+import json
+
+from sqlalchemy import select
+
+from src.conf.config import settings
+from src.database.models import Contact
+
+HEADER = "first_name,last_name,email,phone,birthday,extra\n"
+
+
+def _row(n: int, email: str | None = None, birthday: str = "1990-05-17") -> str:
+    email = email or f"contact{n}@example.com"
+    return f"Name{n},Last,{email},+380501234567,{birthday},\n"
+
+
+async def _import(client, content: str, filename: str = "contacts.csv"):
+    return await client.post(
+        "/api/contacts/import", files={"file": (filename, content.encode())}
+    )
+
+
+async def _emails(db) -> list[str]:
+    return list(await db.scalars(select(Contact.email).order_by(Contact.id)))
+
+
+async def test_import_keeps_first_of_duplicates_in_file(client, db):
+    content = HEADER + _row(1) + _row(2) + _row(3, email="contact1@example.com")
+
+    res = await _import(client, content)
+
+    assert res.status_code == 200
+    report = res.json()
+    assert (report["rows"], report["imported"], report["conflicts"]) == (3, 2, 1)
+    (error,) = report["errors"]
+    assert error["line"] == 4 and error["email"] == "contact1@example.com"
+    assert error["detail"] == "Duplicate email in file"
+    assert await _emails(db) == ["contact1@example.com", "contact2@example.com"]
+
+
+async def test_import_merges_into_existing_contacts(client, db):
+    await _import(client, HEADER + _row(1) + _row(2))
+
+    res = await _import(client, HEADER + _row(2) + _row(3) + _row(1))
+
+    report = res.json()
+    assert (report["imported"], report["conflicts"]) == (1, 2)
+    assert [(e["line"], e["detail"]) for e in report["errors"]] == [
+        (2, "Email already exists"),
+        (4, "Email already exists"),
+    ]
+    assert sorted(await _emails(db)) == [
+        "contact1@example.com",
+        "contact2@example.com",
+        "contact3@example.com",
+    ]
+
+
+async def test_import_rejects_invalid_rows(client, db):
+    content = (
+        HEADER
+        + _row(1)
+        + _row(2, email="not-an-email")
+        + _row(3, birthday="31.12.1990")
+        + "Name4,Last,contact4@example.com\n"  # без phone і birthday
+        + _row(5).replace("Name5", "N" * 26)  # first_name довше VARCHAR(25)
+    )
+
+    res = await _import(client, content)
+
+    report = res.json()
+    assert (report["rows"], report["imported"], report["invalid"]) == (5, 1, 4)
+    assert [e["line"] for e in report["errors"]] == [3, 4, 5, 6]
+    assert report["errors"][0]["detail"].startswith("email:")
+    assert report["errors"][3]["detail"] == "first_name: longer than 25 characters"
+    assert await _emails(db) == ["contact1@example.com"]
+
+
+async def test_import_jsonl_reports_broken_lines(client):
+    good = {
+        "first_name": "Name",
+        "last_name": "Last",
+        "email": "jsonl@example.com",
+        "phone": "+380501234567",
+        "birthday": "1990-05-17",
+    }
+    content = "\n".join([json.dumps(good), "{broken", "[1, 2]"]) + "\n"
+
+    res = await _import(client, content, "contacts.jsonl")
+
+    report = res.json()
+    assert (report["imported"], report["invalid"]) == (1, 2)
+    assert report["errors"][0]["detail"].startswith("Invalid JSON")
+    assert report["errors"][1]["detail"] == "JSON object expected"
+
+
+async def test_import_file_size_limit(client, db, monkeypatch):
+    content = HEADER + _row(1)
+    monkeypatch.setattr(settings, "IMPORT_MAX_BYTES", len(content) - 1)
+
+    res = await _import(client, content)
+
+    assert res.status_code == 413
+    assert await _emails(db) == []
+
+
+async def test_import_unknown_format(client):
+    res = await _import(client, HEADER, "contacts.txt")
+    assert res.status_code == 415
@@ -0,0 +1,59 @@
+import pytest
+from fastapi import HTTPException
+
+from src.repository.contacts import CURSOR_TYPES
+from src.services.pagination import decode_cursor, encode_cursor
+
+
+@pytest.mark.parametrize(
+    "sort, values",
+    [
+        ("id", [42]),
+        ("name", ["Shevchenko", "Taras", 7]),
+        ("search", [15]),
+        ("search:trgm", [0.42, 15]),
+        ("search:trgm", [1, 15]),
+    ],
+)
+def test_cursor_round_trip(sort, values):
+    cursor = encode_cursor(sort, values)
+    assert decode_cursor(cursor, sort, CURSOR_TYPES[sort]) == values
+
+
+@pytest.mark.parametrize(
+    "sort, values",
+    [
+        ("id", ["42"]),
+        ("id", [4.2]),
+        ("id", [True]),
+        ("id", [None]),
+        ("id", [10**30]),  # поза INTEGER (int4)
+        ("id", [2**31]),
+        ("name", ["Shevchenko", "Taras", -(2**31) - 1]),
+        ("name", [1, "Taras", 7]),
+        ("name", ["Shevchenko", None, 7]),
+        ("name", ["Shevchenko", "Taras", "7"]),
+        ("search", [{"id": 1}]),
+        ("search:trgm", ["0.42", 15]),
+        ("search:trgm", [0.42, 1.5]),
+    ],
+)
+def test_cursor_value_types_checked(sort, values):
+    cursor = encode_cursor(sort, values)
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, sort, CURSOR_TYPES[sort])
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        encode_cursor("name", [42]),  # інший режим сортування
+        encode_cursor("id", [1, 2]),  # інша довжина ключа
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "id", CURSOR_TYPES["id"])
+    assert exc.value.status_code == 400
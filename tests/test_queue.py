@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+import pytest
+import redis.asyncio as redis
+from fakeredis import FakeAsyncRedis
+
+import worker
+from src.services.queue import JobQueue
+
+
+@pytest.fixture
+async def client():
+    client = FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def queue(client):
+    # visibility_timeout=0: задача прострочена вже на наступному reserve
+    return JobQueue(client, "test", max_attempts=2, visibility_timeout=0)
+
+
+async def test_expired_lease_counts_as_attempt(queue):
+    await queue.enqueue("send_email", "a@example.com")
+    _, job = await queue.reserve()
+    assert job["attempts"] == 0
+
+    _, job = await queue.reserve()  # воркер не відповів - задача повернулась
+
+    assert job["attempts"] == 1
+    assert job["args"] == ["a@example.com"] and job["kwargs"] == {}
+    assert (await queue.stats())["expired"] == 1
+
+
+async def test_expired_lease_dead_letters_after_max_attempts(queue, client):
+    await queue.enqueue("send_email")
+    await queue.reserve()
+    await queue.reserve()
+
+    assert await queue.reserve() is None
+    stats = await queue.stats()
+    assert stats["dead"] == 1 and stats["processing"] == 0 and stats["depth"] == 0
+    dead = json.loads(await client.lindex(queue.dead_key, 0))
+    assert dead["attempts"] == 2
+    assert dead["args"] == []
+
+
+async def test_fail_and_expiry_share_attempts(client):
+    queue = JobQueue(
+        client, "test", max_attempts=2, backoff_base=0, visibility_timeout=0
+    )
+    await queue.enqueue("send_email")
+    raw, job = await queue.reserve()
+    await queue.fail(raw, job, RuntimeError("smtp down"))  # backoff 0 - одразу в ready
+    await queue.reserve()  # attempts == 1, лізинг прострочиться
+
+    assert await queue.reserve() is None
+    assert (await queue.stats())["dead"] == 1
+
+
+class BrokenQueue:
+
+    def __init__(self, stop: asyncio.Event):
+        self.stop = stop
+        self.calls = 0
+
+    async def reserve(self):
+        self.calls += 1
+        if self.calls > 1:
+            self.stop.set()
+        raise redis.ConnectionError("Connection refused")
+
+
+async def test_consume_survives_redis_errors(monkeypatch):
+    stop = asyncio.Event()
+    broken = BrokenQueue(stop)
+    monkeypatch.setattr(worker, "email_queue", broken)
+    monkeypatch.setattr(worker, "REDIS_RETRY_DELAY", 0.01)
+
+    await asyncio.wait_for(worker.consume(stop), timeout=1)
+
+    assert broken.calls == 2
@@ -0,0 +1,35 @@
+from datetime import date
+
+from pydantic import TypeAdapter
+
+from src.schemas import ContactResponse
+from src.services.serialization import CONTACT_RESPONSE_FIELDS, contact_rows_json
+
+adapter = TypeAdapter(list[ContactResponse])
+
+
+def test_rows_json_matches_pydantic():
+    contacts = [
+        {
+            "id": 1,
+            "first_name": "Taras",
+            "last_name": "Shevchenko",
+            "email": "taras@example.com",
+            "phone": "+380501234567",
+            "birthday": date(1814, 3, 9),
+            "extra": None,
+        },
+        {
+            "id": 2,
+            "first_name": "Леся",
+            "last_name": "Українка",
+            "email": "lesya@example.com",
+            "phone": "+380671234567",
+            "birthday": date(1871, 2, 25),
+            "extra": "Поетеса \"Лісова пісня\"",
+        },
+    ]
+    rows = [tuple(c[name] for name in CONTACT_RESPONSE_FIELDS) for c in contacts]
+
+    expected = adapter.dump_json(adapter.validate_python(contacts))
+    assert contact_rows_json(rows) == expected
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import signal
+from contextlib import suppress
+
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.services.cache import redis_client
+from src.services.email import deliver_email, mailer, preload_templates, debug_spool
+from src.services.queue import email_queue
+
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+logger = logging.getLogger("worker")
+
+# Обробники задач черги: task -> корутина
+TASKS = {
+    "send_email": deliver_email,
+}
+
+POLL_INTERVAL = 0.5  # секунд, коли черга порожня
+REDIS_RETRY_DELAY = 1  # секунд після помилки Redis
+
+
+# Пауза, яку перериває зупинка воркера
+async def _pause(stop: asyncio.Event, seconds: float) -> None:
+    with suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(stop.wait(), seconds)
+
+
+async def consume(stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            reserved = await email_queue.reserve()
+        except redis.RedisError as err:
+            logger.warning(f"Email queue reserve failed: {err}")
+            await _pause(stop, REDIS_RETRY_DELAY)
+            continue
+        if reserved is None:
+            await _pause(stop, POLL_INTERVAL)
+            continue
+
+        raw, job = reserved
+        error = None
+        try:
+            await TASKS[job["task"]](*job["args"], **job["kwargs"])
+        except Exception as err:
+            logger.warning(f"Job {job['id']} ({job['task']}) failed: {err!r}")
+            error = err
+        try:
+            if error is None:
+                await email_queue.ack(raw)
+            else:
+                await email_queue.fail(raw, job, error)
+        except redis.RedisError as err:
+            # задача лишається в processing і повернеться після visibility timeout
+            logger.warning(f"Job {job['id']} result not saved: {err}")
+            await _pause(stop, REDIS_RETRY_DELAY)
+
+
+# Окремий процес для відправки листів з Redis-черги (API-воркери SMTP не торкаються)
+async def main():
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, stop.set)
+
+    preload_templates()
+    debug_spool.start()
+
+    concurrency = settings.EMAIL_WORKER_CONCURRENCY
+    logger.info(f"Email worker started (concurrency={concurrency})")
+    try:
+        await asyncio.gather(*(consume(stop) for _ in range(concurrency)))
+    finally:
+        await mailer.close()
+        await debug_spool.stop()
+        await redis_client.aclose()
+        logger.info("Email worker stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+
+# poetry run python worker.py